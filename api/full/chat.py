@@ -0,0 +1,139 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import sys
+import os
+
+# Add the chatbot modules to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'chatbot'))
+
+from request_profiler import profiling_decided, is_profiling_requested
+from scheduler import SchedulerBusy, get_client_id, is_trusted_forward
+from config import FORWARD_SECRET
+from cancellation import RequestCancelled, DISCONNECTED
+
+# Import only what we need. `chatbot` is src/chatbot/chatbot.py here (src/chatbot is on the path),
+# never the chatbot package, so a module named like the package must not be imported as chatbot.chatbot.
+IMPORT_ERROR = None
+try:
+    from chatbot import get_scheduled_chat_result, get_metrics
+except ImportError as e:
+    # Fallback if import fails - reported loudly, so a broken import is not mistaken for an outage
+    IMPORT_ERROR = f"{type(e).__name__}: {e}"
+    print(f"Full chat handler is answering with a stub, chatbot import failed: {IMPORT_ERROR}")
+    
+    def get_scheduled_chat_result(message, client_id="anonymous", source="api", connection=None):
+        return {'route': 'unavailable', 'response': f"SkillCapital: {message} - CrewAI processing temporarily unavailable."}
+    
+    def get_metrics():
+        return {'import_error': IMPORT_ERROR}
+
+class handler(BaseHTTPRequestHandler):
+    def send_json(self, status, response_data, headers=None):
+        # Set CORS headers
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(response_data).encode())
+    
+    def do_POST(self):
+        try:
+            # Get the request body
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            request_data = json.loads(post_data.decode('utf-8'))
+            
+            # Extract the message from the request
+            user_message = request_data.get('message', '')
+            
+            if not user_message:
+                response_data = {
+                    'error': 'No message provided',
+                    'response': 'Please provide a message to chat with SkillCapital.'
+                }
+            else:
+                # Get response from the chatbot. The work runs on an LLM lane thread, so only the
+                # decision to profile is made here; the profiles are taken where the work happens.
+                with profiling_decided(is_profiling_requested(self.headers)):
+                    # The LLM work is cancelled if this connection closes before the answer is ready
+                    # Only the lightweight function may name the end user; anyone else is known by address
+                    client_id = get_client_id(self.headers, getattr(self, 'client_address', None),
+                                              trusted=is_trusted_forward(self.headers, FORWARD_SECRET))
+                    result = get_scheduled_chat_result(user_message, client_id, connection=getattr(self, 'connection', None))
+                
+                response_data = {
+                    'response': result['response'],
+                    'status': 'success',
+                    'metadata': {
+                        'route': result.get('route'),
+                        'lane': result.get('lane'),
+                        'agent': result.get('agent'),
+                        'latency_ms': result.get('latency_ms'),
+                        'usage': result.get('usage')
+                    }
+                }
+            
+            # Send the response
+            self.send_json(200, response_data)
+            
+        except RequestCancelled as e:
+            if e.reason == DISCONNECTED:
+                # Nobody is left to read a response
+                self.close_connection = True
+                return
+            self.send_json(504, {
+                'error': 'The request took too long and was cancelled',
+                'response': 'Sorry, that took too long to answer. Please try again.'
+            })
+        except SchedulerBusy as e:
+            self.send_json(503, {
+                'error': str(e),
+                'response': 'SkillCapital is busy right now. Please try again in a moment.'
+            }, {'Retry-After': str(e.retry_after)})
+        except Exception as e:
+            error_response = {
+                'error': str(e),
+                'response': 'Sorry, I encountered an error. Please try again.'
+            }
+            self.send_json(200, error_response)
+    
+    def do_OPTIONS(self):
+        # Handle preflight requests
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+    
+    def do_GET(self):
+        # Handle GET requests (health check)
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        response_data = {
+            'status': 'online' if IMPORT_ERROR is None else 'degraded',
+            'message': 'SkillCapital Chatbot API is running',
+            'endpoints': {
+                'POST /api/chat/full': 'Send a message that needs the CrewAI/LLM agents',
+                'GET /api/chat/full': 'Health check'
+            },
+            'metrics': get_metrics()
+        }
+        
+        self.wfile.write(json.dumps(response_data).encode())
+
+if __name__ == '__main__':
+    # Local multi-threaded server: python api/full/chat.py [port]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.getenv('PORT', '8000'))
+    server = ThreadingHTTPServer(('', port), handler)
+    print(f"Serving the full chat API on http://localhost:{port}/api/chat/full")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,44 +1,105 @@
 from http.server import BaseHTTPRequestHandler
+import http.client
 import json
+import socket
+import sys
 import os
+import urllib.error
+import urllib.parse
 
-def get_simple_response(user_message):
-    """Simple response function without heavy dependencies"""
-    user_message_lower = user_message.lower().strip()
-    
-    # SkillCapital specific responses
-    if any(word in user_message_lower for word in ['hello', 'hi', 'hey']):
-        return "👋 Hi! Welcome to SkillCapital - India's #1 Premium Training Platform! How can I assist you today?"
-    
-    if any(word in user_message_lower for word in ['price', 'cost', 'how much']):
-        return "₹ 999 for premium AI-driven training"
-    
-    if any(word in user_message_lower for word in ['duration', 'how long', 'time']):
-        return "30 Hours of comprehensive training"
-    
-    if any(word in user_message_lower for word in ['course', 'courses']):
-        return "We offer Python, DevOps, AWS, Azure, React.js, UI/UX, HTML/CSS, Terraform, Kubernetes, and SRE courses. Which one interests you?"
-    
-    if any(word in user_message_lower for word in ['python']):
-        return "Python Programming Course: Learn Python from basics to advanced concepts. Perfect for beginners and experienced developers."
-    
-    if any(word in user_message_lower for word in ['aws', 'amazon']):
-        return "AWS Cloud Course: Master Amazon Web Services including EC2, S3, Lambda, and more. Get AWS certified!"
-    
-    if any(word in user_message_lower for word in ['azure', 'microsoft']):
-        return "Microsoft Azure Course: Learn cloud computing with Azure services, deployment, and management."
-    
-    if any(word in user_message_lower for word in ['react', 'javascript']):
-        return "React.js Course: Build modern web applications with React, JavaScript, and modern frontend technologies."
+# Add the shared chatbot modules to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'chatbot'))
+
+from request_profiler import profile_request, is_profiling_requested
+from core import route_query, clean_text, list_courses, catalog, get_offline_answer
+from scheduler import CLIENT_ID_HEADER, FORWARD_SECRET_HEADER, get_client_id
+from cancellation import CancelToken, RequestCancelled, disconnect_watcher
+from config import FULL_CHAT_URL, FULL_CHAT_TIMEOUT, FORWARD_SECRET
+
+# Marks requests forwarded by this function so they are never forwarded twice
+FORWARDED_HEADER = 'X-Chat-Forwarded'
+
+DEFAULT_RESPONSE = "Thank you for your message! I'm here to help with information about SkillCapital courses, pricing, and enrollment. What would you like to know?"
+
+def forward_to_full_chat(user_message, url, client_id=None, connection=None):
+    """Hand a query that needs an LLM to the full chat function, on behalf of the end user's client id.
+
+    If the client behind `connection` hangs up first, the upstream connection is shut down
+    so the full function's own disconnect watcher cancels the LLM work, and RequestCancelled is raised.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise ValueError(f"Unsupported full chat URL: {url}")
+    path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+    headers = {'Content-Type': 'application/json', FORWARDED_HEADER: '1'}
+    if client_id and FORWARD_SECRET:
+        # Without it the full function sees every user as this function and cannot share its workers fairly
+        headers[CLIENT_ID_HEADER] = client_id
+        headers[FORWARD_SECRET_HEADER] = FORWARD_SECRET
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    upstream = connection_class(parts.netloc, timeout=FULL_CHAT_TIMEOUT)
+    token = CancelToken()
+    try:
+        with disconnect_watcher.watch(connection, token):
+            upstream.connect()
+            token.add_callback(lambda: upstream.sock.shutdown(socket.SHUT_RDWR))
+            upstream.request('POST', path, json.dumps({'message': user_message}).encode('utf-8'), headers)
+            response = upstream.getresponse()
+            body = response.read()
+    except (OSError, http.client.HTTPException):
+        # A hop we shut down ourselves is a cancellation, not a failure of the full function
+        token.check()
+        raise
+    finally:
+        upstream.close()
+    if response.status != 200:
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+    return json.loads(body.decode('utf-8'))
+
+def get_fallback_result(user_message):
+    """Offline FAQ answer, or the default response, when the full chat function cannot be used"""
+    match = get_offline_answer(clean_text(user_message))
+    if match is None:
+        return {'response': DEFAULT_RESPONSE, 'metadata': {'route': 'default'}}
+    return {'response': match['answer'], 'metadata': {'route': 'offline', 'confidence': match['confidence']}}
+
+def get_simple_result(user_message, full_chat_url='', client_id=None, connection=None):
+    """Answer deterministic queries locally and hand the rest to the full chat function"""
+    route = route_query(clean_text(user_message))
+    if route.get('answer') is not None:
+        return {'response': route['answer'], 'metadata': {'route': route['route']}}
     
-    if any(word in user_message_lower for word in ['devops']):
-        return "DevOps Course: Learn CI/CD, Docker, Kubernetes, and modern deployment practices."
+    if not full_chat_url:
+        return get_fallback_result(user_message)
+    try:
+        forwarded = forward_to_full_chat(user_message, full_chat_url, client_id, connection)
+    except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError):
+        return get_fallback_result(user_message)
+    # Pass the full function's route, latency and token usage through
+    return {
+        'response': forwarded.get('response') or DEFAULT_RESPONSE,
+        'metadata': forwarded.get('metadata', {'route': route['route']})
+    }
+
+def get_simple_response(user_message, full_chat_url=''):
+    """Response text only, see get_simple_result"""
+    return get_simple_result(user_message, full_chat_url)['response']
+
+def get_course_listing(query: str) -> dict:
+    """Paginated course listing for GET /api/courses?category=&q=&page=&page_size="""
+    params = urllib.parse.parse_qs(query)
     
-    if any(word in user_message_lower for word in ['enroll', 'sign up', 'register']):
-        return "Great! To enroll in our courses, visit our website or contact our support team. All courses are ₹999 for 30 hours of premium training."
+    def param(name, default=None):
+        return params.get(name, [default])[0]
     
-    # Default response
-    return "Thank you for your message! I'm here to help with information about SkillCapital courses, pricing, and enrollment. What would you like to know?"
+    try:
+        page = int(param('page', '1'))
+        page_size = min(int(param('page_size', '20')), 100)
+    except ValueError:
+        return {'error': 'page and page_size must be integers'}
+    listing = list_courses(category=param('category'), keyword=param('q'), page=page, page_size=page_size)
+    listing['categories'] = catalog.categories()
+    return listing
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
@@ -66,16 +127,26 @@ class handler(BaseHTTPRequestHandler):
                 }
             else:
                 # Get response from the simple chatbot
-                bot_response = get_simple_response(user_message)
+                with profile_request('POST /api/simple_chat', force=is_profiling_requested(self.headers)):
+                    # Never forward a request that was already forwarded to us
+                    full_chat_url = '' if self.headers.get(FORWARDED_HEADER) else FULL_CHAT_URL
+                    # The forward is abandoned, upstream too, if this connection closes first
+                    result = get_simple_result(user_message, full_chat_url,
+                                               get_client_id(self.headers, getattr(self, 'client_address', None)),
+                                               connection=getattr(self, 'connection', None))
                 
                 response_data = {
-                    'response': bot_response,
-                    'status': 'success'
+                    'response': result['response'],
+                    'status': 'success',
+                    'metadata': result['metadata']
                 }
             
             # Send the response
             self.wfile.write(json.dumps(response_data).encode())
             
+        except RequestCancelled:
+            # The client hung up; nobody is left to read a response
+            self.close_connection = True
         except Exception as e:
             error_response = {
                 'error': str(e),
@@ -92,19 +163,27 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
     
     def do_GET(self):
-        # Handle GET requests (health check)
+        # Handle GET requests (course listing or health check)
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
         
+        url = urllib.parse.urlsplit(self.path)
+        if url.path.rstrip('/') == '/api/courses':
+            self.wfile.write(json.dumps(get_course_listing(url.query)).encode())
+            return
+        
         response_data = {
             'status': 'online',
             'message': 'SkillCapital Simple Chatbot API is running',
             'endpoints': {
-                'POST /api/simple': 'Send a message to chat with the bot',
-                'GET /api/simple': 'Health check'
-            }
+                'POST /api/chat': 'Send a message to chat with the bot',
+                'GET /api/chat': 'Health check',
+                'GET /api/courses': 'Course listing (?category=&q=&page=&page_size=)'
+            },
+            # Queries that need the CrewAI/LLM agents go to the full function only when FULL_CHAT_URL is set
+            'llm_forwarding': bool(FULL_CHAT_URL)
         }
         
         self.wfile.write(json.dumps(response_data).encode()) 
\ No newline at end of file
@@ -1,13 +1,86 @@
 import os
 from typing import List
 
+# Repository root, so data and output paths do not depend on the working directory
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
 # OpenAI Configuration - Use environment variables for security
 OPEN_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
 OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.7'))
 
+# Minimum confidence (0-1) for resolving misspelled course names locally
+COURSE_MATCH_THRESHOLD = float(os.getenv('COURSE_MATCH_THRESHOLD', '0.75'))
+
+# Course catalog - JSON files and/or directories of JSON files, separated by os.pathsep; later files win
+COURSE_CATALOG_PATHS = [
+    path for path in os.getenv(
+        'COURSE_CATALOG_PATHS', os.path.join(PROJECT_ROOT, 'src', 'website_data', 'course_curriculum.json')
+    ).split(os.pathsep) if path
+]
+# Courses per page in course listings
+COURSE_PAGE_SIZE = int(os.getenv('COURSE_PAGE_SIZE', '20'))
+
+# Offline FAQ answers used when the LLM providers are unavailable - files and/or directories like the catalog
+FAQ_PATHS = [
+    path for path in os.getenv('FAQ_PATHS', os.path.join(PROJECT_ROOT, 'src', 'website_data', 'faq.json')).split(os.pathsep)
+    if path
+]
+# Minimum confidence (0-1, share of the query matched) for an offline answer
+OFFLINE_ANSWER_MIN_CONFIDENCE = float(os.getenv('OFFLINE_ANSWER_MIN_CONFIDENCE', '0.3'))
+
+# CrewAI agent definitions (role, goal, backstory, task templates, routing keywords)
+AGENTS_FILE = os.getenv('AGENTS_FILE', os.path.join(PROJECT_ROOT, 'src', 'chatbot', 'agents.json'))
+
+# Per-agent output budgets (set in agents.json) shrink or recover after every BUDGET_WINDOW answers
+ADAPTIVE_BUDGETS = os.getenv('ADAPTIVE_BUDGETS', 'true').lower() in ('1', 'true', 'yes')
+BUDGET_WINDOW = int(os.getenv('BUDGET_WINDOW', '20'))
+
+# Speculative execution - run the top two candidate agents concurrently for ambiguous queries
+SPECULATIVE_AGENTS = os.getenv('SPECULATIVE_AGENTS', 'false').lower() in ('1', 'true', 'yes')
+SPECULATIVE_GRACE_SECONDS = float(os.getenv('SPECULATIVE_GRACE_SECONDS', '1.5'))
+SPECULATIVE_MAX_WORKERS = int(os.getenv('SPECULATIVE_MAX_WORKERS', '8'))
+
+# Request scheduling - deterministic answers run inline, LLM requests share a bounded pool
+LLM_WORKERS = int(os.getenv('LLM_WORKERS', '4'))
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '32'))
+LLM_MAX_QUEUE_PER_CLIENT = int(os.getenv('LLM_MAX_QUEUE_PER_CLIENT', '4'))
+# Seconds (queue wait included) before an LLM request is cancelled; 0 disables the deadline.
+# Kept under FULL_CHAT_TIMEOUT so the full function answers before the lightweight one gives up.
+LLM_REQUEST_DEADLINE = float(os.getenv('LLM_REQUEST_DEADLINE', '50'))
+
+# Request profiling - off unless sampled (0-1) or requested with the X-Profile-Token header
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(PROJECT_ROOT, 'profiles'))
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '30'))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+
+# Structured event/query log - written off the request path to rotating .jsonl.gz files; empty disables it
+EVENT_LOG_DIR = os.getenv('EVENT_LOG_DIR', '')
+EVENT_LOG_MAX_BYTES = int(os.getenv('EVENT_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+EVENT_LOG_BACKUPS = int(os.getenv('EVENT_LOG_BACKUPS', '10'))
+EVENT_LOG_QUEUE_SIZE = int(os.getenv('EVENT_LOG_QUEUE_SIZE', '10000'))
+
+# Full (CrewAI) chat function that the lightweight function hands LLM queries to. It is too
+# large for Vercel, so it runs elsewhere; empty means LLM queries get offline answers.
+FULL_CHAT_URL = os.getenv('FULL_CHAT_URL', '')
+FULL_CHAT_TIMEOUT = float(os.getenv('FULL_CHAT_TIMEOUT', '55'))
+# Shared by both functions; the full function only takes the end user's client id from hops
+# that carry it, so browsers cannot pick their own fairness key. Empty trusts no hop.
+FORWARD_SECRET = os.getenv('FORWARD_SECRET', '')
+
 # Website Configuration
-WEBSITE_URL = "https://www.skillcapital.ai"
+WEBSITE_URL = os.getenv('WEBSITE_URL', "https://www.skillcapital.ai")
+
+# Local knowledge snapshot of the website, built by src/chatbot/crawler.py and searched offline
+SITE_SNAPSHOT_FILE = os.getenv('SITE_SNAPSHOT_FILE', os.path.join(PROJECT_ROOT, 'src', 'website_data', 'site_snapshot.jsonl'))
+SITE_CONTEXT_PASSAGES = int(os.getenv('SITE_CONTEXT_PASSAGES', '3'))
+CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', '200'))
+CRAWL_CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', '4'))
+CRAWL_HOST_DELAY = float(os.getenv('CRAWL_HOST_DELAY', '0.5'))
+CRAWL_TIMEOUT = float(os.getenv('CRAWL_TIMEOUT', '10'))
+CRAWL_USER_AGENT = os.getenv('CRAWL_USER_AGENT', 'SkillCapitalBot/1.0 (+https://www.skillcapital.ai)')
 
 # Exit phrases for the chatbot
 EXIT_PHRASES = [
@@ -0,0 +1,157 @@
+"""Benchmark the course catalog at scale.
+
+Usage: python scripts/bench_catalog.py [--courses 10000] [--per-file 500] [--repeat 200]
+
+Generates a synthetic catalog split over several JSON files, then reports
+load time and memory of the catalog and course index next to the plain
+json.load representation, lookup and listing latencies, and the time to
+reload after one file changes.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src', 'chatbot'))
+
+from catalog import CourseCatalog
+from course_index import CourseIndex
+
+CATEGORIES = ['Programming', 'Cloud', 'DevOps', 'Web Development', 'Design', 'Data Science',
+              'Security', 'Databases', 'Mobile', 'Networking']
+TOPICS = ['python', 'java', 'golang', 'rust', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+          'react', 'angular', 'vue', 'figma', 'pandas', 'spark', 'kafka', 'postgres', 'mongodb', 'android',
+          'swift', 'linux', 'ansible', 'jenkins', 'graphql', 'redis', 'tensorflow', 'pytorch', 'nginx', 'ccna']
+LEVELS = ['fundamentals', 'intermediate', 'advanced', 'professional', 'bootcamp', 'masterclass']
+MODULE_WORDS = ['introduction', 'setup', 'architecture', 'networking', 'security', 'testing', 'deployment',
+                'monitoring', 'performance', 'automation', 'storage', 'scaling', 'debugging', 'patterns']
+
+
+def generate_courses(count, seed=7):
+    rng = random.Random(seed)
+    courses = {}
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        level = rng.choice(LEVELS)
+        name = f"{topic.title()} {level.title()} {i}"
+        courses[name.lower()] = {
+            'name': name,
+            'category': rng.choice(CATEGORIES),
+            'aliases': [f"{topic} {level} {i}", f"{topic}{i}"],
+            'short_description': f"Learn {topic} at the {level} level",
+            'modules': [f"{rng.choice(MODULE_WORDS).title()} with {topic.title()} part {n}" for n in range(1, 13)],
+            'duration': '30 Hours',
+            'price': '₹ 999'
+        }
+    return courses
+
+
+def write_catalog(directory, courses, per_file):
+    items = list(courses.items())
+    paths = []
+    for start in range(0, len(items), per_file):
+        path = os.path.join(directory, f"courses-{start // per_file:04d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'courses': dict(items[start:start + per_file])}, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def measure_memory(build):
+    """Time and retained memory of building an object"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, {'seconds': round(elapsed, 3), 'retained_mb': round(current / 2 ** 20, 1),
+                   'peak_mb': round(peak / 2 ** 20, 1)}
+
+
+def latency(function, arguments, repeat):
+    """Median and p95 latency in microseconds over the given argument lists"""
+    samples = []
+    for i in range(repeat):
+        args = arguments[i % len(arguments)]
+        start = time.perf_counter()
+        function(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {'median_us': round(statistics.median(samples), 1), 'p95_us': round(samples[int(len(samples) * 0.95) - 1], 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark course catalog memory and lookup latency")
+    parser.add_argument('--courses', type=int, default=10000, help="number of synthetic courses")
+    parser.add_argument('--per-file', type=int, default=500, help="courses per catalog file")
+    parser.add_argument('--repeat', type=int, default=200, help="calls per latency measurement")
+    args = parser.parse_args()
+
+    courses = generate_courses(args.courses)
+    keys = list(courses)
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_catalog(directory, courses, args.per_file)
+
+        def load_plain():
+            data = {}
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    data.update(json.load(f)['courses'])
+            return data
+
+        _, plain = measure_memory(load_plain)
+        catalog, catalog_memory = measure_memory(lambda: CourseCatalog([directory]))
+        index, index_memory = measure_memory(lambda: CourseIndex(catalog.courses))
+
+        sample_keys = [rng.choice(keys) for _ in range(50)]
+        typos = []
+        for key in sample_keys:
+            name = courses[key]['name'].lower()
+            position = rng.randrange(1, len(name) - 1)
+            typos.append((f"tell me about the {name[:position]}{name[position + 1:]} course",))
+
+        report = {
+            'courses': len(catalog),
+            'files': len(paths),
+            'memory': {'plain_json': plain, 'catalog': catalog_memory, 'course_index': index_memory},
+            'latency': {
+                'get': latency(catalog.get, [(key,) for key in sample_keys], args.repeat),
+                'resolve_exact': latency(index.resolve, [(f"{key} course",) for key in sample_keys], args.repeat),
+                'resolve_typo': latency(index.resolve, typos, args.repeat),
+                'keyword_search': latency(catalog.search, [(topic,) for topic in TOPICS], args.repeat),
+                'list_page': latency(lambda page: catalog.list_courses(page=page), [(page,) for page in range(1, 50)], args.repeat),
+                'list_category': latency(lambda category: catalog.list_courses(category=category), [(c,) for c in CATEGORIES], args.repeat),
+                'list_category_keyword': latency(
+                    lambda category, keyword: catalog.list_courses(category=category, keyword=keyword),
+                    [(rng.choice(CATEGORIES), rng.choice(TOPICS)) for _ in range(20)], args.repeat
+                )
+            }
+        }
+
+        # Touch one file and time the incremental reload plus the course index rebuild
+        os.utime(paths[0], (time.time() + 5, time.time() + 5))
+        start = time.perf_counter()
+        reloaded = catalog.reload()
+        reload_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        CourseIndex(catalog.courses)
+        report['reload_one_file'] = {
+            'reloaded': reloaded,
+            'catalog_seconds': round(reload_seconds, 3),
+            'index_rebuild_seconds': round(time.perf_counter() - start, 3)
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Measure bundle size and cold-start time of the two Vercel functions.
+
+Usage: python scripts/measure_functions.py [--runs 5]
+
+Bundle size is the function's own source and data plus the installed size of
+the distributions in its requirements.txt (reported as missing if a package
+is not installed here). Cold start is the wall time of a fresh interpreter
+importing the handler and answering one deterministic query.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from importlib import metadata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FUNCTIONS = {
+    'simple_chat': {
+        'entry': 'api/simple_chat.py',
+        'requirements': 'api/requirements.txt',
+        # The lightweight function only needs the dependency-free core, not chatbot.py
+        'sources': ['config.py', 'src/chatbot', 'src/website_data'],
+        'exclude': ['src/chatbot/chatbot.py']
+    },
+    'full_chat': {
+        'entry': 'api/full/chat.py',
+        'requirements': 'api/full/requirements.txt',
+        'sources': ['config.py', 'src/chatbot', 'src/website_data'],
+        'exclude': []
+    }
+}
+
+COLD_START_SCRIPT = """
+import importlib.util, io, json, sys, time
+from email.message import Message
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('entry', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+
+class Probe(module.handler):
+    def __init__(self, body):
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+        self.headers = Message()
+        self.headers['Content-Length'] = str(len(body))
+        self.request_version = 'HTTP/1.1'
+    def send_response(self, *args): pass
+    def send_header(self, *args): pass
+    def end_headers(self): pass
+
+Probe(json.dumps({'message': 'kubernetes course'}).encode()).do_POST()
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_request_ms': (done - imported) * 1000}))
+"""
+
+
+def source_size(config):
+    total = 0
+    excluded = {os.path.join(ROOT, path) for path in config['exclude']}
+    paths = [config['entry']] + config['sources']
+    for path in paths:
+        full_path = os.path.join(ROOT, path)
+        if os.path.isfile(full_path):
+            total += os.path.getsize(full_path)
+            continue
+        for directory, dirs, files in os.walk(full_path):
+            dirs[:] = [name for name in dirs if name != '__pycache__']
+            for name in files:
+                file_path = os.path.join(directory, name)
+                if file_path not in excluded:
+                    total += os.path.getsize(file_path)
+    return total
+
+
+def requirement_names(path):
+    names = []
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                names.append(re.split(r'[<>=!~\[; ]', line, 1)[0])
+    return names
+
+
+def distribution_size(name, seen):
+    """Installed size of a distribution and its dependencies"""
+    key = name.lower().replace('_', '-')
+    if key in seen:
+        return 0, []
+    seen.add(key)
+    try:
+        dist = metadata.distribution(name)
+    except metadata.PackageNotFoundError:
+        return 0, [name]
+    size = 0
+    for file in dist.files or []:
+        try:
+            size += os.path.getsize(file.locate())
+        except OSError:
+            pass
+    missing = []
+    for requirement in dist.requires or []:
+        if 'extra ==' in requirement:
+            continue
+        dep_size, dep_missing = distribution_size(re.split(r'[<>=!~\[; (]', requirement, 1)[0], seen)
+        size += dep_size
+        missing += dep_missing
+    return size, missing
+
+
+def cold_start(config, runs):
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'measure-only')
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT, os.path.join(ROOT, config['entry'])],
+            capture_output=True, text=True, cwd=ROOT, env=env
+        )
+        if result.returncode != 0:
+            return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+        'first_request_ms': round(statistics.median(sample['first_request_ms'] for sample in samples), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Vercel function bundle size and cold start")
+    parser.add_argument('--runs', type=int, default=5, help="cold starts to take the median of")
+    args = parser.parse_args()
+
+    report = {}
+    for name, config in FUNCTIONS.items():
+        seen = set()
+        dependency_bytes = 0
+        missing = []
+        for requirement in requirement_names(config['requirements']):
+            size, not_installed = distribution_size(requirement, seen)
+            dependency_bytes += size
+            missing += not_installed
+        report[name] = {
+            'source_kb': round(source_size(config) / 1024, 1),
+            'dependencies_mb': round(dependency_bytes / (1024 * 1024), 1),
+            'missing_dependencies': sorted(set(missing)),
+            'cold_start': cold_start(config, args.runs)
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
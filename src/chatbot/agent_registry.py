@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Tuple
+
+# Fields that only shape the task; changing them does not require a new Agent
+TASK_FIELDS = ('priority', 'keywords', 'task_description', 'expected_output', 'budget', 'site_context')
+
+# Output budget used when neither the agent nor the data file sets one
+DEFAULT_BUDGET = {'max_tokens': 500}
+
+
+def load_agent_definitions(path: str) -> Dict[str, Any]:
+    """Load agent definitions from a JSON data file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Agent definitions file not found: {path}")
+        return {}
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing error in agent definitions: {e}")
+        return {}
+
+
+class AgentRegistry:
+    """Builds CrewAI agents from a data file, caching their settings and chat models.
+
+    Each crew run gets its own Agent: CrewAI keeps the running executor and its message
+    history on the Agent, so requests served at the same time must not share one.
+    """
+
+    def __init__(self, path: str, llm_config: Dict[str, Any]):
+        self.path = path
+        self.llm_config = dict(llm_config)
+        self.lock = threading.RLock()
+        # Agent type -> (signature, Agent keyword arguments including the shared LLM)
+        self.agents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.llms: Dict[str, Any] = {}
+        self.builds = 0
+        self.mtime = None
+        self.data: Dict[str, Any] = {}
+        self.reload()
+
+    def reload(self) -> bool:
+        """Re-read the definitions file if it changed; returns True when it was reloaded"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        with self.lock:
+            if self.data and mtime == self.mtime:
+                return False
+            self.data = load_agent_definitions(self.path)
+            self.mtime = mtime
+            return True
+
+    def set_llm_config(self, **config) -> None:
+        """Update the shared LLM settings; agents are rebuilt lazily if they differ"""
+        with self.lock:
+            self.llm_config.update(config)
+
+    @property
+    def default_agent(self) -> str:
+        return self.data.get('default_agent', 'advisor')
+
+    def definitions(self) -> Dict[str, Dict[str, Any]]:
+        return self.data.get('agents', {})
+
+    def resolve(self, agent_type: str) -> str:
+        """The agent type that actually serves a request for agent_type"""
+        return agent_type if agent_type in self.definitions() else self.default_agent
+
+    def agent_types(self) -> List[str]:
+        """Agent types in order of routing precedence"""
+        definitions = self.definitions()
+        return sorted(definitions, key=lambda name: definitions[name].get('priority', 100))
+
+    def keywords(self, agent_type: str) -> List[str]:
+        return self.definitions().get(agent_type, {}).get('keywords', [])
+
+    def budget(self, name: str) -> Dict[str, Any]:
+        """Output budget (max_tokens, min_tokens, stop, latency_slo_ms) for an agent or route"""
+        budget = dict(DEFAULT_BUDGET)
+        budget.update(self.data.get('default_budget', {}))
+        budget.update(self.definitions().get(name, {}).get('budget', {}))
+        return budget
+
+    def uses_site_context(self, agent_type: str) -> bool:
+        """Whether the agent's tasks get passages from the website snapshot"""
+        return bool(self.definitions().get(self.resolve(agent_type), {}).get('site_context'))
+
+    def agent_llm_config(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Shared LLM settings with per-agent overrides from the definition"""
+        config = dict(self.llm_config)
+        config.update(definition.get('llm', {}))
+        return config
+
+    def get_llm(self, config: Dict[str, Any]):
+        """Create or reuse the chat model for an LLM config"""
+        signature = json.dumps(config, sort_keys=True, default=str)
+        llm = self.llms.get(signature)
+        if llm is None:
+            if config.get('stream'):
+                # CrewAI converts a LangChain model without its streaming flag, and only
+                # emits stream chunk events for its own LLM built with stream=True
+                from crewai import LLM
+                llm = LLM(**config)
+            else:
+                from langchain_openai import ChatOpenAI
+                llm = ChatOpenAI(**config)
+            self.llms[signature] = llm
+        return llm
+
+    def get_agent(self, agent_type: str, **llm_overrides):
+        """Build a fresh agent for one crew run from the cached settings of its type"""
+        with self.lock:
+            name = self.resolve(agent_type)
+            definition = self.definitions().get(name)
+            if definition is None:
+                raise KeyError(f"No agent definition for '{agent_type}'")
+
+            agent_fields = {key: value for key, value in definition.items() if key not in TASK_FIELDS and key != 'llm'}
+            llm_config = self.agent_llm_config(definition)
+            llm_config.update(llm_overrides)
+            signature = json.dumps([agent_fields, llm_config], sort_keys=True, default=str)
+
+            cached = self.agents.get(name)
+            if cached is None or cached[0] != signature:
+                cached = (signature, {
+                    'role': agent_fields['role'],
+                    'goal': agent_fields['goal'],
+                    'backstory': agent_fields['backstory'],
+                    'verbose': agent_fields.get('verbose', False),
+                    'allow_delegation': agent_fields.get('allow_delegation', False),
+                    'llm': self.get_llm(llm_config)
+                })
+                self.agents[name] = cached
+            self.builds += 1
+
+        from crewai import Agent
+        return Agent(**cached[1])
+
+    def task_spec(self, agent_type: str, question: str) -> Tuple[str, str]:
+        """Task description and expected output for a question"""
+        definition = self.definitions().get(agent_type)
+        if definition is None:
+            definition = self.data.get('default_task', {})
+            description = definition.get('description', "Answer this question: {question}")
+        else:
+            description = definition.get('task_description', "Answer this question: {question}")
+        expected_output = definition.get('expected_output', "Provide a helpful and informative response.")
+        return description.format(question=question), expected_output
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'defined': self.agent_types(),
+                'built': sorted(self.agents),
+                'builds': self.builds
+            }
@@ -0,0 +1,105 @@
+import math
+from array import array
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from course_index import tokenize, STOPWORDS
+
+# Question words that carry no meaning for ranking, on top of the course STOPWORDS
+QUERY_STOPWORDS = STOPWORDS | {
+    'how', 'why', 'when', 'where', 'who', 'can', 'does', 'did', 'it', 'this', 'that', 'there', 'be',
+    'will', 'would', 'should', 'get', 'any', 'some', 'we', 'us', 'our', 'at', 'by', 'from', 'as', 'if'
+}
+
+
+def stem(token: str) -> str:
+    """Very light stemming so plurals match (refunds -> refund, classes -> class)"""
+    if len(token) > 4 and token.endswith('es') and token[-3] in 'sxz':
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Tokens used for indexing and querying"""
+    return [stem(token) for token in tokenize(text) if token not in QUERY_STOPWORDS]
+
+
+class SearchHit(NamedTuple):
+    """A ranked document; confidence is the score relative to a perfect match on every query term"""
+    doc_id: int
+    score: float
+    confidence: float
+
+
+class BM25Index:
+    """BM25 over multi-field documents with impacts precomputed at build time.
+
+    Each term maps to parallel arrays of document ids and their final BM25
+    contribution, so a query only sums precomputed numbers along a few
+    short posting lists.
+    """
+
+    def __init__(self, documents: List[Dict[str, str]], field_weights: Optional[Dict[str, float]] = None,
+                 k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        field_weights = field_weights or {}
+        frequencies: List[Dict[str, float]] = []
+        lengths: List[float] = []
+        for document in documents:
+            counts: Dict[str, float] = defaultdict(float)
+            length = 0.0
+            for field, text in document.items():
+                weight = field_weights.get(field, 1.0)
+                for term in analyze(text or ''):
+                    counts[term] += weight
+                    length += weight
+            frequencies.append(counts)
+            lengths.append(length)
+
+        self.size = len(documents)
+        average_length = (sum(lengths) / self.size) if self.size else 1.0
+        document_frequency: Dict[str, int] = defaultdict(int)
+        for counts in frequencies:
+            for term in counts:
+                document_frequency[term] += 1
+        self.idf = {term: self.term_idf(count) for term, count in document_frequency.items()}
+        # Unknown query terms count as the rarest possible term when judging confidence
+        self.max_idf = self.term_idf(0)
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for doc_id, counts in enumerate(frequencies):
+            norm = k1 * (1 - b + b * lengths[doc_id] / (average_length or 1.0))
+            for term, tf in counts.items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = (array('I'), array('d'))
+                posting[0].append(doc_id)
+                posting[1].append(self.idf[term] * tf * (k1 + 1) / (tf + norm))
+        self.postings = postings
+
+    def term_idf(self, document_frequency: int) -> float:
+        return math.log(1 + (self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search(self, query: str, limit: int = 5) -> List[SearchHit]:
+        """Top documents for a query, best first"""
+        terms = set(analyze(query))
+        if not terms or not self.size:
+            return []
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            for doc_id, impact in zip(*posting):
+                scores[doc_id] += impact
+        if not scores:
+            return []
+
+        ceiling = sum(self.idf.get(term, self.max_idf) for term in terms) * (self.k1 + 1)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [SearchHit(doc_id, round(score, 4), round(score / ceiling, 4)) for doc_id, score in ranked]
@@ -0,0 +1,162 @@
+import select
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# Reasons a request is cancelled
+DISCONNECTED = 'disconnected'
+DEADLINE = 'deadline'
+# A concurrent run (e.g. the losing speculative agent) is no longer needed
+SUPERSEDED = 'superseded'
+
+# How often the watcher looks at client sockets and deadlines
+WATCH_INTERVAL = 0.2
+
+
+class RequestCancelled(BaseException):
+    """Raised inside cancelled work.
+
+    Derives from BaseException (like asyncio.CancelledError) so the
+    `except Exception` fallbacks around LLM calls do not turn a
+    cancellation into another LLM call.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Cooperative cancellation flag with an optional deadline, shared by everything serving one request"""
+
+    def __init__(self, deadline: Optional[float] = None):
+        # Deadline in time.monotonic() seconds
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self.lock = threading.Lock()
+        self.callbacks: List[Callable[[], Any]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE)
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        """Raise RequestCancelled if the request was cancelled"""
+        if self.cancelled:
+            raise RequestCancelled(self.reason)
+
+    def cancel(self, reason: str) -> bool:
+        """Cancel once and run the callbacks; returns False if it was already cancelled"""
+        with self.lock:
+            if self.reason is not None:
+                return False
+            self.reason = reason
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def add_callback(self, callback: Callable[[], Any]) -> Callable[[], None]:
+        """Run callback on cancellation (right away if already cancelled); returns a function that removes it"""
+        with self.lock:
+            if self.reason is None:
+                self.callbacks.append(callback)
+                return lambda: self.remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def remove_callback(self, callback: Callable[[], Any]) -> None:
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def child(self) -> 'CancelToken':
+        """Token with the same deadline that is cancelled with this one but can also be cancelled on its own"""
+        child = CancelToken(self.deadline)
+        child.add_callback(self.add_callback(lambda: child.cancel(self.reason)))
+        return child
+
+
+# Cancel token of the request being handled
+current_cancel_token: ContextVar[Optional[CancelToken]] = ContextVar('current_cancel_token', default=None)
+
+
+def check_cancelled() -> None:
+    """Raise RequestCancelled if the current request was cancelled"""
+    token = current_cancel_token.get()
+    if token is not None:
+        token.check()
+
+
+def is_client_disconnected(sock: socket.socket) -> bool:
+    """True once the peer has closed the connection; pending request data does not count"""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+    except BlockingIOError:
+        return False
+    except (OSError, ValueError):
+        return True
+
+
+class DisconnectWatcher:
+    """One background thread that cancels requests whose client hung up or whose deadline passed"""
+
+    def __init__(self, interval: float = WATCH_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.watched: Dict[int, tuple] = {}
+        self.thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def watch(self, sock: Optional[socket.socket], token: CancelToken):
+        """Watch a client socket (may be None) and the token's deadline while the block runs"""
+        key = id(token)
+        try:
+            sock = sock if sock is not None and sock.fileno() >= 0 else None
+        except (OSError, AttributeError):
+            sock = None
+        with self.lock:
+            self.watched[key] = (sock, token)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='disconnect-watcher', daemon=True)
+                self.thread.start()
+        try:
+            yield token
+        finally:
+            with self.lock:
+                self.watched.pop(key, None)
+
+    def run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                watched = list(self.watched.items())
+            for key, (sock, token) in watched:
+                if token.cancelled:
+                    continue
+                if sock is not None and is_client_disconnected(sock):
+                    token.cancel(DISCONNECTED)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'watched': len(self.watched)}
+
+
+disconnect_watcher = DisconnectWatcher()
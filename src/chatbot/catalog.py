@@ -0,0 +1,266 @@
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from course_index import tokenize, STOPWORDS
+
+# Course fields kept as attributes; anything else in the data file goes to Course.extra
+COURSE_FIELDS = ('name', 'category', 'short_description', 'aliases', 'modules', 'duration', 'price')
+
+
+class Course(NamedTuple):
+    """A course held as a tuple; modules are stored as one newline-joined string"""
+    key: str
+    name: str
+    category: str
+    short_description: str
+    aliases: Tuple[str, ...]
+    module_text: str
+    duration: str
+    price: str
+    source: str
+    extra: Optional[Dict[str, Any]]
+
+    @property
+    def modules(self) -> List[str]:
+        return self.module_text.split('\n') if self.module_text else []
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Dict-style access so callers written for the JSON dicts keep working"""
+        value = getattr(self, field, None)
+        if value is None and self.extra:
+            value = self.extra.get(field)
+        return default if value is None else value
+
+
+def make_course(key: str, data: Dict[str, Any], source: str) -> Course:
+    """Convert one course from the data file into its compact form"""
+    extra = {field: value for field, value in data.items() if field not in COURSE_FIELDS}
+    return Course(
+        key=sys.intern(key),
+        name=data.get('name', 'Unknown Course'),
+        # Category, duration, price and source repeat across courses - keep one copy of each
+        category=sys.intern(data.get('category', '')),
+        short_description=data.get('short_description', ''),
+        aliases=tuple(data.get('aliases', ())),
+        module_text='\n'.join(data.get('modules', ())),
+        duration=sys.intern(data.get('duration', '')),
+        price=sys.intern(data.get('price', '')),
+        source=source,
+        extra=extra or None
+    )
+
+
+def course_terms(course: Course) -> set:
+    """Keywords a course is found by: its key, name, aliases, category, description and modules"""
+    text = ' '.join((course.key, course.name, ' '.join(course.aliases), course.category,
+                     course.short_description, course.module_text))
+    return {sys.intern(token) for token in tokenize(text) if token not in STOPWORDS}
+
+
+def catalog_files(paths: List[str]) -> List[str]:
+    """Expand catalog paths into data files; directories contribute their *.json files in name order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json'))
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            print(f"Course catalog path not found: {path}")
+    return files
+
+
+class CatalogShard:
+    """Courses, site data and keyword postings of a single catalog file"""
+
+    def __init__(self, path: str, mtime: float, data: Dict[str, Any]):
+        self.path = path
+        self.mtime = mtime
+        self.site = {key: value for key, value in data.items() if key != 'courses'}
+        self.courses: Dict[str, Course] = {}
+        postings: Dict[str, List[str]] = defaultdict(list)
+        for key, course_data in data.get('courses', {}).items():
+            course = make_course(key.lower().strip(), course_data, path)
+            self.courses[course.key] = course
+            for term in course_terms(course):
+                postings[term].append(course.key)
+        # Frozen to tuples - far smaller than sets and only ever read
+        self.postings: Dict[str, Tuple[str, ...]] = {term: tuple(keys) for term, keys in postings.items()}
+
+
+def load_shard(path: str, mtime: float) -> Optional[CatalogShard]:
+    """Parse one catalog file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return CatalogShard(path, mtime, json.load(f))
+    except FileNotFoundError:
+        print(f"Course catalog file not found: {path}")
+    except UnicodeDecodeError as e:
+        print(f"Encoding error reading course file {path}: {e}")
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing error in {path}: {e}")
+    return None
+
+
+class CatalogState:
+    """Everything read from the catalog files at one point in time.
+
+    Built in full by a reload and never changed afterwards, so readers that
+    take one state see a consistent catalog while the next one is built.
+    """
+
+    def __init__(self, files: List[str], shards: Dict[str, CatalogShard]):
+        self.shards = shards
+        # Later files override site data and courses with the same key from earlier ones
+        site: Dict[str, Any] = {}
+        courses: Dict[str, Course] = {}
+        for path in files:
+            if path in shards:
+                site.update(shards[path].site)
+                courses.update(shards[path].courses)
+        self.site = site
+        self.courses = courses
+        ordered = sorted(courses, key=lambda key: (courses[key].name.lower(), key))
+        by_category: Dict[str, List[str]] = defaultdict(list)
+        for key in ordered:
+            by_category[courses[key].category.lower()].append(key)
+        self.ordered: Tuple[str, ...] = tuple(ordered)
+        self.rank = {key: position for position, key in enumerate(ordered)}
+        self.by_category: Dict[str, Tuple[str, ...]] = {category: tuple(keys) for category, keys in by_category.items()}
+        self.category_names = {course.category.lower(): course.category for course in courses.values() if course.category}
+
+
+class CourseCatalog:
+    """Course catalog loaded from one or more JSON files or directories, reloaded per file"""
+
+    def __init__(self, paths: List[str]):
+        self.paths = list(paths)
+        self.lock = threading.RLock()
+        self.state = CatalogState([], {})
+        self.reloads = 0
+        self.reload()
+
+    @property
+    def site(self) -> Dict[str, Any]:
+        return self.state.site
+
+    @property
+    def courses(self) -> Dict[str, Course]:
+        return self.state.courses
+
+    def reload(self) -> bool:
+        """Re-read only the files that changed, appeared or disappeared; returns True if anything did"""
+        with self.lock:
+            files = catalog_files(self.paths)
+            previous = self.state.shards
+            changed = set(previous) != set(files)
+            shards = {}
+            for path in files:
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                shard = previous.get(path)
+                if shard is None or shard.mtime != mtime:
+                    loaded = load_shard(path, mtime)
+                    if loaded is not None:
+                        shard = loaded
+                        changed = True
+                    elif shard is not None:
+                        # Most likely caught mid-save; keep serving the last good copy and retry next time
+                        print(f"Keeping the previous courses of {path}")
+                if shard is not None:
+                    shards[path] = shard
+            if not changed:
+                return False
+
+            # Readers see the old state or the new one, never a mix of both
+            self.state = CatalogState(files, shards)
+            self.reloads += 1
+            return True
+
+    def __len__(self) -> int:
+        return len(self.state.courses)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.state.courses
+
+    def get(self, key: str) -> Optional[Course]:
+        return self.state.courses.get(key)
+
+    def categories(self) -> Dict[str, int]:
+        """Number of courses per category"""
+        state = self.state
+        return {name: len(state.by_category[lowered]) for lowered, name in sorted(state.category_names.items())}
+
+    def match_category(self, text: str) -> Optional[str]:
+        """The category named in free text, if any"""
+        text = ' ' + ' '.join(tokenize(text)) + ' '
+        for lowered, category in sorted(self.state.category_names.items(), key=lambda item: -len(item[0])):
+            if ' ' + ' '.join(tokenize(lowered)) + ' ' in text:
+                return category
+        return None
+
+    def search(self, keyword: str, state: Optional[CatalogState] = None) -> set:
+        """Keys of courses matching every keyword term, via the per-file inverted indexes"""
+        state = state or self.state
+        terms = [term for term in tokenize(keyword) if term not in STOPWORDS]
+        if not terms:
+            return set()
+        matches = set()
+        for shard in state.shards.values():
+            keys = None
+            for term in terms:
+                posting = shard.postings.get(term, ())
+                keys = set(posting) if keys is None else keys.intersection(posting)
+                if not keys:
+                    break
+            if keys:
+                # Skip courses that a later file overrides
+                matches.update(key for key in keys if state.courses[key].source == shard.path)
+        return matches
+
+    def list_courses(self, category: Optional[str] = None, keyword: Optional[str] = None,
+                     page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """One page of courses in name order, optionally filtered by category and keyword"""
+        state = self.state
+        page = max(1, page)
+        page_size = max(1, page_size)
+        keys = state.by_category.get(category.lower(), ()) if category else state.ordered
+        if keyword:
+            matches = self.search(keyword, state)
+            if category:
+                keys = [key for key in keys if key in matches]
+            else:
+                keys = sorted(matches, key=state.rank.__getitem__)
+
+        start = (page - 1) * page_size
+        items = []
+        for key in keys[start:start + page_size]:
+            course = state.courses[key]
+            items.append({
+                'key': course.key,
+                'name': course.name,
+                'category': course.category,
+                'short_description': course.short_description
+            })
+        return {
+            'items': items,
+            'total': len(keys),
+            'page': page,
+            'page_size': page_size,
+            'pages': (len(keys) + page_size - 1) // page_size
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            'files': len(state.shards),
+            'courses': len(state.courses),
+            'categories': len(state.category_names),
+            'reloads': self.reloads
+        }
@@ -1,10 +1,14 @@
 import os
 import sys
 import json
-import requests
-from typing import Dict, Any
+import argparse
+import threading
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional
+from contextlib import contextmanager
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 # Add watchdog for auto-reload functionality
 try:
@@ -25,7 +29,7 @@ try:
                 self.callback()
 except ImportError:
     WATCHDOG_AVAILABLE = False
-    print("Watchdog not available. Auto-reload disabled.")
+    print("Watchdog not available. Auto-reload disabled.", file=sys.stderr)
     
     # Dummy class when watchdog is not available
     class ConfigFileHandler:
@@ -36,49 +40,29 @@ except ImportError:
         def on_modified(self, event):
             pass
 
-def safe_print(message: str) -> None:
-    """Safely print messages with proper encoding"""
-    try:
-        print(message)
-    except UnicodeEncodeError:
-        # Fallback to ASCII-safe printing
-        safe_message = message.encode('ascii', errors='replace').decode('ascii')
-        print(safe_message)
-
-def clean_text(text: str) -> str:
-    """Clean text to ensure ASCII compatibility"""
-    if not isinstance(text, str):
-        return str(text)
-    try:
-        # Try to encode as ASCII, replacing problematic characters
-        return text.encode('ascii', errors='replace').decode('ascii')
-    except UnicodeError:
-        # If that fails, try a more aggressive cleaning
-        return ''.join(char for char in text if ord(char) < 128)
 root_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(root_path)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import OPEN_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, WEBSITE_URL, EXIT_PHRASES, CHATBOT_NAME
+from config import SPECULATIVE_AGENTS, SPECULATIVE_GRACE_SECONDS, SPECULATIVE_MAX_WORKERS
+from config import ADAPTIVE_BUDGETS, BUDGET_WINDOW, SITE_SNAPSHOT_FILE, SITE_CONTEXT_PASSAGES
+from config import LLM_WORKERS, LLM_MAX_QUEUE, LLM_MAX_QUEUE_PER_CLIENT, LLM_REQUEST_DEADLINE
+from request_profiler import profile_request
+from event_log import request_event, record, add_step, event_logger, iter_log_lines
+from token_usage import UsageTracker, BudgetManager, request_usage, summarize_usage
+from site_snapshot import SiteSnapshot
+from scheduler import RequestScheduler, FAST_LANE, LLM_LANE
+from cancellation import CancelToken, RequestCancelled, SUPERSEDED, current_cancel_token, check_cancelled, disconnect_watcher
 
-# Import CrewAI components
-from crewai import Agent, Task, Crew
-from langchain_openai import ChatOpenAI
-
-# Load course curriculum data
-def load_course_data() -> Dict[str, Any]:
-    """Load course curriculum from JSON file"""
-    try:
-        with open('src/website_data/course_curriculum.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Course curriculum file not found")
-        return {}
-    except UnicodeDecodeError as e:
-        print(f"Encoding error reading course file: {e}")
-        return {}
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        return {}
+# Routing, course data and static answers live in the dependency-free core
+import core
+from core import (
+    safe_print, clean_text, catalog, list_courses, agent_registry,
+    get_greeting_response, get_price_response, get_duration_response,
+    get_course_content, format_course_content, get_all_courses,
+    is_skillcapital_related, rank_agent_types, route_query, get_offline_answer
+)
 
 # Load OpenAI API Key from config
 api_key = OPEN_API_KEY
@@ -89,12 +73,9 @@ if not api_key:
 # Set environment variable for CrewAI compatibility
 os.environ['OPENAI_API_KEY'] = api_key
 
-# Load course data
-course_data = load_course_data()
-
 def reload_configuration():
-    """Reload configuration and course data"""
-    global course_data, api_key, openai_client, llm, advisor_agent, research_agent, technical_agent
+    """Reload configuration, agent definitions and course data"""
+    global api_key, openai_client
     
     try:
         # Reload config
@@ -107,55 +88,20 @@ def reload_configuration():
             # Reinitialize OpenAI client
             openai_client = OpenAI(api_key=api_key)
             
-            # Reinitialize LLM
-            llm = ChatOpenAI(
-                model=OPENAI_MODEL,
-                temperature=OPENAI_TEMPERATURE,
-                api_key=api_key
-            )
-            
-            # Reinitialize agents
-            advisor_agent = Agent(
-                role="SkillCapital Course Advisor",
-                goal="Provide accurate and helpful information about SkillCapital courses",
-                backstory="You are an expert course advisor at SkillCapital, a leading online learning platform. You have deep knowledge of all courses, pricing, and curriculum details. You provide concise, accurate, and friendly responses to help students make informed decisions.",
-                verbose=False,
-                allow_delegation=False,
-                llm=llm
-            )
-            
-            research_agent = Agent(
-                role="Research Assistant",
-                goal="Provide accurate and helpful information on any topic",
-                backstory="You are a knowledgeable research assistant who can provide helpful information on any topic. You give human-like, conversational responses that are informative and engaging.",
-                verbose=False,
-                allow_delegation=False,
-                llm=llm
-            )
-            
-            technical_agent = Agent(
-                role="Technical Expert",
-                goal="Provide detailed technical explanations and programming guidance",
-                backstory="You are a technical expert with deep knowledge of programming languages, frameworks, and technologies. You can explain complex technical concepts in simple terms and provide practical guidance.",
-                verbose=False,
-                allow_delegation=False,
-                llm=llm
-            )
+            # Agents are rebuilt on next use only if their LLM config changed
+            agent_registry.set_llm_config(model=OPENAI_MODEL, temperature=OPENAI_TEMPERATURE, api_key=api_key)
+        
+        # Agents are rebuilt on next use only if their definition changed
+        agent_registry.reload()
         
-        # Reload course data
-        course_data = load_course_data()
+        # Reload course data and pick up a newer website snapshot
+        core.reload_course_data()
+        site_snapshot.load()
         print("✅ Configuration reloaded successfully!")
         
     except Exception as e:
         print(f"❌ Error reloading configuration: {e}")
 
-# Initialize LLM for CrewAI
-llm = ChatOpenAI(
-    model=OPENAI_MODEL,
-    temperature=OPENAI_TEMPERATURE,
-    api_key=api_key
-)
-
 # Initialize OpenAI client for direct ChatGPT calls
 try:
     from openai import OpenAI
@@ -164,212 +110,267 @@ except ImportError:
     print("OpenAI library not found. Please install it: pip install openai")
     sys.exit(1)
 
-# Create CrewAI Agents
-advisor_agent = Agent(
-    role="SkillCapital Course Advisor",
-    goal="Provide accurate and helpful information about SkillCapital courses, pricing, and enrollment",
-    backstory="You are an expert course advisor at SkillCapital, India's #1 Premium Training Platform. You have deep knowledge of all courses, pricing, curriculum details, and enrollment processes. You provide concise, accurate, and friendly responses to help students make informed decisions. You always mention SkillCapital's AI-driven platform and premium quality training.",
-    verbose=False,
-    allow_delegation=False,
-    llm=llm
-)
+# CrewAI agents are defined in agents.json and only constructed when first used
+agent_registry.set_llm_config(api_key=api_key)
 
-# Create Research Agent for general questions
-research_agent = Agent(
-    role="Research Assistant",
-    goal="Provide accurate and helpful information on any topic",
-    backstory="You are a knowledgeable research assistant who can provide helpful information on any topic. You give human-like, conversational responses that are informative and engaging.",
-    verbose=False,
-    allow_delegation=False,
-    llm=llm
-)
+# Token accounting per agent/route/model and adaptive per-agent output budgets
+CHATGPT_MODEL = "gpt-3.5-turbo"
+usage_tracker = UsageTracker()
+budget_manager = BudgetManager(agent_registry.budget, window=BUDGET_WINDOW, adaptive=ADAPTIVE_BUDGETS)
 
-# Create Technical Expert Agent
-technical_agent = Agent(
-    role="Technical Expert",
-    goal="Provide detailed technical explanations and programming guidance",
-    backstory="You are a technical expert with deep knowledge of programming languages, frameworks, and technologies. You can explain complex technical concepts in simple terms and provide practical guidance.",
-    verbose=False,
-    allow_delegation=False,
-    llm=llm
-)
-
-# Create Enrollment Agent for SkillCapital
-enrollment_agent = Agent(
-    role="SkillCapital Enrollment Specialist",
-    goal="Help students enroll in SkillCapital courses and provide enrollment guidance",
-    backstory="You are an enrollment specialist at SkillCapital, India's #1 Premium Training Platform. You help students understand the enrollment process, course benefits, and guide them through signing up. You're friendly, encouraging, and always emphasize the value of SkillCapital's AI-driven training platform.",
-    verbose=False,
-    allow_delegation=False,
-    llm=llm
-)
+def record_llm_usage(budget_name: str, route: str, model: str, prompt_tokens: int, completion_tokens: int,
+                     latency_ms: float, truncated: bool) -> None:
+    """Account one LLM call and feed it to the budget of the agent that made it"""
+    usage_tracker.record(budget_name, route, model, prompt_tokens, completion_tokens, latency_ms, truncated)
+    budget_manager.observe(budget_name, completion_tokens, latency_ms, truncated)
 
-def get_greeting_response(user_input: str) -> str:
-    """Get greeting response"""
-    user_input_clean = user_input.lower().strip()
-    greeting_responses = course_data.get('greeting_responses', {})
-    
-    for greeting, response in greeting_responses.items():
-        if greeting in user_input_clean:
-            return response
-    
-    return "👋 Hi! Welcome to SkillCapital - India's #1 Premium Training Platform! How can I assist you today?"
+# Requests cancelled because the client left or the deadline passed, and the output tokens that saved
+cancellation_lock = threading.Lock()
+cancellation_stats = {
+    'cancelled': 0,
+    'disconnected': 0,
+    'deadline': 0,
+    'cancelled_llm_calls': 0,
+    'tokens_saved_estimate': 0
+}
 
-def get_price_response(user_input: str) -> str:
-    """Get price information"""
-    return "₹ 999 for premium AI-driven training"
+def record_cancelled_call(step: str, token: Optional[CancelToken], tokens_saved: int, start: float, **fields) -> None:
+    """Account an LLM call stopped by cancellation with an estimate of the output tokens it did not generate"""
+    tokens_saved = max(0, tokens_saved)
+    with cancellation_lock:
+        cancellation_stats['cancelled_llm_calls'] += 1
+        cancellation_stats['tokens_saved_estimate'] += tokens_saved
+    add_step(step, cancelled=token.reason if token is not None else None, tokens_saved=tokens_saved,
+             latency_ms=round((time.perf_counter() - start) * 1000, 2), **fields)
 
-def get_duration_response(user_input: str) -> str:
-    """Get duration information"""
-    return "30 Hours of comprehensive training"
+def record_cancellation(reason: str, tokens_saved: int = 0) -> None:
+    """Count a cancelled request; tokens_saved covers LLM work that never started"""
+    with cancellation_lock:
+        cancellation_stats['cancelled'] += 1
+        cancellation_stats[reason] = cancellation_stats.get(reason, 0) + 1
+        cancellation_stats['tokens_saved_estimate'] += tokens_saved
 
-def get_course_content(course_name: str) -> str:
-    """Get specific course content"""
-    courses = course_data.get('courses', {})
-    
-    # Find course by name (case insensitive)
-    course_name_lower = course_name.lower().strip()
-    
-    # Handle AWS variations
-    if any(word in course_name_lower for word in ['aws', 'amazon', 'cloud']):
-        for key, course in courses.items():
-            if 'aws' in key or 'cloud' in key:
-                return format_course_content(course)
-    
-    # Handle Azure variations
-    if any(word in course_name_lower for word in ['azure', 'microsoft']):
-        for key, course in courses.items():
-            if 'azure' in key:
-                return format_course_content(course)
-    
-    # Handle React.js variations
-    if any(word in course_name_lower for word in ['react', 'reactjs', 'react.js', 'javascript', 'js']):
-        for key, course in courses.items():
-            if 'react' in key or 'javascript' in key:
-                return format_course_content(course)
-        
-        # Special handling for "react js" course
-        if 'react js' in courses:
-            return format_course_content(courses['react js'])
-    
-    # Handle other courses
-    for key, course in courses.items():
-        if course_name_lower in key or key in course_name_lower:
-            return format_course_content(course)
-    
-    return "Course not found. Please check the course name."
+def get_cancellation_stats() -> Dict[str, Any]:
+    """Cancellation counters for the health check endpoint"""
+    with cancellation_lock:
+        stats = dict(cancellation_stats)
+    stats['watched'] = disconnect_watcher.stats()['watched']
+    stats['deadline_seconds'] = LLM_REQUEST_DEADLINE
+    return stats
 
-def format_course_content(course: dict) -> str:
-    """Format course content for display"""
-    name = course.get('name', 'Unknown Course')
-    modules = course.get('modules', [])
-    
-    if not modules:
-        return f"Course: {name}\nNo modules available."
-    
-    formatted_modules = "\n".join([f"• {module}" for module in modules])
-    return f"Course: {name}\nModules:\n{formatted_modules}"
-
-def get_all_courses() -> str:
-    """Get all available courses"""
-    courses = course_data.get('courses', {})
-    if not courses:
-        return "No courses available."
-    
-    course_list = []
-    for key, course in courses.items():
-        name = course.get('name', 'Unknown Course')
-        course_list.append(f"• {name}")
-    
-    return "Available Courses:\n" + "\n".join(course_list)
+# Website knowledge crawled ahead of time by crawler.py; never fetched at request time
+site_snapshot = SiteSnapshot(SITE_SNAPSHOT_FILE)
 
 def get_live_website_data() -> str:
-    """Get live data from SkillCapital website"""
-    try:
-        url = "https://www.skillcapital.ai"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract relevant information
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "SkillCapital"
-        
-        # Get meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        description = meta_desc.get('content', '').strip() if meta_desc else ""
-        
-        return f"Live data from {title_text}: {description}"
-    except Exception as e:
-        return f"Unable to fetch live data: {str(e)}"
+    """Get the SkillCapital homepage title and description from the website snapshot"""
+    site_snapshot.load()
+    homepage = site_snapshot.get(WEBSITE_URL.rstrip('/') + '/') or site_snapshot.get(WEBSITE_URL)
+    if homepage is None:
+        return "No website snapshot available. Run src/chatbot/crawler.py to build one."
+    title_text = homepage.get('title') or "SkillCapital"
+    return f"Website data from {title_text}: {homepage.get('description', '')}"
+
+def get_site_context(question: str) -> str:
+    """Website passages relevant to a question, formatted for an agent task"""
+    matches = site_snapshot.search(question, limit=SITE_CONTEXT_PASSAGES)
+    if not matches:
+        return ""
+    lines = [f"- {clean_text(match['snippet'])} (source: {match['url']})" for match in matches]
+    return "Relevant information from the SkillCapital website:\n" + "\n".join(lines)
 
-def get_chatgpt_response(user_input: str) -> str:
-    """Get response from ChatGPT for non-SkillCapital queries"""
+# Every failed LLM answer (ChatGPT or CrewAI) starts with this
+LLM_ERROR_PREFIX = "Sorry, I couldn't process your request"
+
+def get_chatgpt_response(user_input: str, on_token: Optional[Callable[[str], None]] = None, route: str = "chatgpt") -> str:
+    """Get response from ChatGPT for non-SkillCapital queries, streaming tokens to on_token if given"""
+    start = time.perf_counter()
+    token = current_cancel_token.get()
+    # Output budget for the direct ChatGPT route
+    limits = budget_manager.limits("chatgpt")
     try:
         # Clean user input to ensure ASCII compatibility
         cleaned_input = clean_text(user_input)
         
+        options = {'max_tokens': limits['max_tokens']}
+        if limits.get('stop'):
+            options['stop'] = limits['stop']
+        # A cancellable request streams so it can stop generating (and paying for) tokens mid-answer
+        stream = on_token is not None or token is not None
+        if stream:
+            options['stream'] = True
+            options['stream_options'] = {'include_usage': True}
+        if token is not None:
+            token.check()
+            if token.deadline is not None:
+                options['timeout'] = token.remaining()
+        
         # Use OpenAI API for ChatGPT responses
         response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=CHATGPT_MODEL,
             messages=[
                 {"role": "system", "content": "You are a helpful assistant. Provide clear, informative, and well-structured responses. Keep responses concise but comprehensive."},
                 {"role": "user", "content": cleaned_input}
             ],
-            max_tokens=500,
-            temperature=0.7
+            temperature=0.7,
+            **options
         )
         
-        # Clean the response to prevent encoding issues
-        result = response.choices[0].message.content.strip()
+        usage = None
+        finish_reason = None
+        if stream:
+            parts = []
+            # Closing the stream from the disconnect watcher also unblocks a read waiting for the next chunk
+            remove_callback = token.add_callback(response.close) if token is not None else lambda: None
+            try:
+                for chunk in response:
+                    if token is not None:
+                        token.check()
+                    # With include_usage the final chunk carries usage and no choices
+                    if getattr(chunk, 'usage', None):
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        delta = clean_text(delta)
+                        parts.append(delta)
+                        if on_token is not None:
+                            on_token(delta)
+            except (Exception, RequestCancelled):
+                if token is None or not token.cancelled:
+                    raise
+                response.close()
+                # Stream chunks carry about one token each; the rest of the budget is never generated
+                record_cancelled_call('chatgpt', token, limits['max_tokens'] - len(parts), start)
+                raise RequestCancelled(token.reason)
+            finally:
+                remove_callback()
+            result = "".join(parts).strip()
+        else:
+            # Clean the response to prevent encoding issues
+            result = response.choices[0].message.content.strip()
+            usage = getattr(response, 'usage', None)
+            finish_reason = response.choices[0].finish_reason
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        record_llm_usage(
+            "chatgpt", route, CHATGPT_MODEL,
+            getattr(usage, 'prompt_tokens', 0) or 0,
+            getattr(usage, 'completion_tokens', 0) or 0,
+            latency_ms, finish_reason == 'length'
+        )
+        add_step('chatgpt', latency_ms=latency_ms)
         return clean_text(result)
         
+    except RequestCancelled:
+        raise
     except UnicodeEncodeError as e:
+        add_step('chatgpt', error=f"encoding: {str(e)}")
         return "Sorry, I couldn't process your request due to encoding issues. Please try again with simpler text."
     except Exception as e:
-        return f"Sorry, I couldn't process your request: {str(e)}"
-
-def is_skillcapital_related(user_input: str) -> bool:
-    """Check if the user input is related to SkillCapital"""
-    skillcapital_keywords = [
-        'skillcapital', 'course', 'courses', 'training', 'learning', 'education',
-        'python', 'devops', 'aws', 'amazon', 'azure', 'microsoft', 'cloud',
-        'react', 'reactjs', 'react js', 'react.js', 'javascript', 'js', 'html', 'css', 
-        'terraform', 'kubernetes', 'sre', 'ui/ux', 'price', 'cost', 'duration', 
-        'curriculum', 'modules', 'enroll', 'enrollment', 'certificate'
-    ]
+        if token is not None and token.cancelled:
+            # The request timed out at its deadline before any output arrived
+            record_cancelled_call('chatgpt', token, limits['max_tokens'], start)
+            raise RequestCancelled(token.reason) from e
+        add_step('chatgpt', error=str(e), latency_ms=round((time.perf_counter() - start) * 1000, 2))
+        return f"{LLM_ERROR_PREFIX}: {str(e)}"
+
+CREWAI_ERROR_PREFIX = "Sorry, I couldn't process your request with CrewAI"
+
+# Where stream chunks of the crew running in this context go. The event bus is global, so
+# one handler is registered for good and concurrent crews each read their own sink.
+crew_token_sink: contextvars.ContextVar = contextvars.ContextVar('crew_token_sink', default=None)
+crew_stream_lock = threading.Lock()
+crew_stream_handler = None
+
+class FinalAnswerStream:
+    """Forwards only the streamed text after CrewAI's "Final Answer:" marker, hiding the agent's reasoning"""
+    MARKER = "Final Answer:"
+    
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        self.buffer = ""
+        self.answering = False
     
-    user_input_lower = user_input.lower().strip()
-    return any(keyword in user_input_lower for keyword in skillcapital_keywords)
+    def __call__(self, chunk: str) -> None:
+        if self.answering:
+            self.on_token(chunk)
+            return
+        self.buffer += chunk
+        index = self.buffer.find(self.MARKER)
+        if index >= 0:
+            self.answering = True
+            answer = self.buffer[index + len(self.MARKER):].lstrip()
+            self.buffer = ""
+            if answer:
+                self.on_token(answer)
+
+def install_crew_stream_handler() -> bool:
+    """Register the global stream chunk handler once; False on CrewAI versions without stream events"""
+    global crew_stream_handler
+    with crew_stream_lock:
+        if crew_stream_handler is not None:
+            return True
+        try:
+            from crewai.utilities.events import crewai_event_bus
+            from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+        except ImportError:
+            return False
+        
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def forward_chunk(source, event):
+            sink = crew_token_sink.get()
+            if sink is not None:
+                sink(clean_text(event.chunk))
+        
+        crew_stream_handler = forward_chunk
+        return True
 
-def get_crewai_response(user_input: str, agent_type: str = "advisor") -> str:
-    """Get response using CrewAI agents"""
+@contextmanager
+def stream_crew_tokens(on_token: Optional[Callable[[str], None]]):
+    """Forward the final answer's stream chunks to on_token while a crew runs, when CrewAI supports it"""
+    if on_token is None or not install_crew_stream_handler():
+        # Older CrewAI without stream events - the caller prints the full answer instead
+        yield
+        return
+    sink_token = crew_token_sink.set(FinalAnswerStream(on_token))
+    try:
+        yield
+    finally:
+        crew_token_sink.reset(sink_token)
+
+def cancel_between_steps(step_output) -> None:
+    """CrewAI step callback that stops a crew after its current step once the request is cancelled.
+
+    Crew only sets the callback on agents that have none, and agents are cached across
+    requests, so it must not close over one request's token: the token is looked up in
+    the context of the request running the crew.
+    """
+    check_cancelled()
+
+def get_crewai_response(user_input: str, agent_type: str = "advisor", on_token: Optional[Callable[[str], None]] = None,
+                        route: str = "agent") -> str:
+    """Get response using CrewAI agents, streaming tokens to on_token when supported"""
+    start = time.perf_counter()
+    token = current_cancel_token.get()
+    agent_name = agent_registry.resolve(agent_type)
+    limits = budget_manager.limits(agent_name)
     try:
         # Clean the input to prevent encoding issues
         cleaned_input = clean_text(user_input)
         
-        # Select appropriate agent based on query type
-        if agent_type == "advisor":
-            agent = advisor_agent
-            task_description = f"Answer this SkillCapital related question: {cleaned_input}"
-            expected_output = "Provide a helpful and accurate response about SkillCapital courses, services, or information. Always mention SkillCapital's premium quality and AI-driven platform."
-        elif agent_type == "research":
-            agent = research_agent
-            task_description = f"Research and answer this question: {cleaned_input}"
-            expected_output = "Provide a comprehensive and informative response on the topic."
-        elif agent_type == "technical":
-            agent = technical_agent
-            task_description = f"Explain this technical concept: {cleaned_input}"
-            expected_output = "Provide a clear technical explanation with practical examples."
-        elif agent_type == "enrollment":
-            agent = enrollment_agent
-            task_description = f"Help with enrollment: {cleaned_input}"
-            expected_output = "Provide helpful enrollment guidance and encourage course signup at SkillCapital."
-        else:
-            agent = advisor_agent
-            task_description = f"Answer this question: {cleaned_input}"
-            expected_output = "Provide a helpful and informative response."
+        # Select appropriate agent based on query type (built on first use)
+        from crewai import Task, Crew
+        llm_options = dict(limits)
+        if on_token is not None:
+            # Stream chunk events need an LLM built with stream=True (see AgentRegistry.get_llm)
+            llm_options['stream'] = True
+        agent = agent_registry.get_agent(agent_type, **llm_options)
+        task_description, expected_output = agent_registry.task_spec(agent_type, cleaned_input)
+        if agent_registry.uses_site_context(agent_type):
+            site_context = get_site_context(cleaned_input)
+            if site_context:
+                task_description = f"{task_description}\n\n{site_context}"
         
         # Create task
         task = Task(
@@ -378,14 +379,20 @@ def get_crewai_response(user_input: str, agent_type: str = "advisor") -> str:
             expected_output=expected_output
         )
         
-        # Create crew and execute
+        # Create crew and execute; a cancelled request stops at the crew's next step
+        crew_options = {}
+        if token is not None:
+            token.check()
+            crew_options['step_callback'] = cancel_between_steps
         crew = Crew(
             agents=[agent],
             tasks=[task],
-            verbose=False
+            verbose=False,
+            **crew_options
         )
         
-        result = crew.kickoff()
+        with stream_crew_tokens(on_token):
+            result = crew.kickoff()
         # Clean the result to prevent encoding issues
         if hasattr(result, 'raw'):
             # Handle CrewOutput object
@@ -393,173 +400,319 @@ def get_crewai_response(user_input: str, agent_type: str = "advisor") -> str:
         else:
             # Handle string result
             cleaned_result = clean_text(str(result).strip())
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        
+        # CrewAI reports usage summed over all LLM calls of the run
+        usage = getattr(result, 'token_usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        llm_calls = getattr(usage, 'successful_requests', 0) or 1
+        # No finish reason is exposed, so treat calls that averaged close to the limit as truncated
+        truncated = completion_tokens / llm_calls >= limits['max_tokens'] * 0.95
+        record_llm_usage(agent_name, route, agent_registry.llm_config.get('model', ''),
+                         prompt_tokens, completion_tokens, latency_ms, truncated)
+        add_step('crewai', agent=agent_type, latency_ms=latency_ms)
         return cleaned_result
         
+    except RequestCancelled:
+        # CrewAI exposes no usage for an interrupted run; count the next LLM call it no longer makes
+        record_cancelled_call('crewai', token, limits['max_tokens'], start, agent=agent_type)
+        raise
     except Exception as e:
-        # More detailed error logging
-        error_msg = f"Sorry, I couldn't process your request with CrewAI: {str(e)}"
-        print(f"DEBUG: CrewAI Error - {str(e)}")  # Debug output
+        error_msg = f"{CREWAI_ERROR_PREFIX}: {str(e)}"
+        add_step('crewai', agent=agent_type, error=str(e), latency_ms=round((time.perf_counter() - start) * 1000, 2))
         return error_msg
 
-def get_mock_response(user_input: str) -> str:
-    """Get mock response when API is not available"""
-    user_input_lower = user_input.lower().strip()
-    
-    # Mock responses for common questions
-    mock_responses = {
-        "what is python": "Python is a high-level, interpreted programming language known for its simplicity and readability. It's widely used for web development, data science, artificial intelligence, and automation. Python emphasizes code readability with its notable use of significant whitespace.",
-        "what is javascript": "JavaScript is a programming language that enables interactive web pages. It's an essential part of web applications and can be used on both the front-end and back-end. JavaScript is known for its versatility and is used in web development, mobile apps, and server-side programming.",
-        "what is react": "React is a JavaScript library for building user interfaces, particularly single-page applications. It's used for handling the view layer and can be used for developing both web and mobile applications. React allows developers to create large web applications that can change data without reloading the page.",
-        "what is aws": "AWS (Amazon Web Services) is a comprehensive cloud computing platform offered by Amazon. It provides a wide range of services including computing power, storage, databases, networking, and more. AWS is widely used for hosting applications, storing data, and building scalable solutions.",
-        "what is azure": "Microsoft Azure is a cloud computing platform and infrastructure created by Microsoft. It provides a wide range of cloud services including computing, analytics, storage, and networking. Azure is used for building, testing, deploying, and managing applications and services.",
-        "what is devops": "DevOps is a set of practices that combines software development (Dev) and IT operations (Ops). It aims to shorten the development lifecycle and provide continuous delivery with high software quality. DevOps includes practices like continuous integration, continuous delivery, and infrastructure as code.",
-        "what is kubernetes": "Kubernetes is an open-source container orchestration platform that automates the deployment, scaling, and management of containerized applications. It helps manage containerized workloads and services, facilitating both declarative configuration and automation.",
-        "what is terraform": "Terraform is an infrastructure as code tool that lets you define and provide data center infrastructure using a declarative configuration language. It manages both low-level components like compute instances, storage, and networking, as well as high-level components like DNS entries and SaaS features."
+# Speculative execution state
+speculative_executor = None
+speculative_lock = threading.Lock()
+speculation_stats = {
+    'runs': 0,
+    'preferred_wins': 0,
+    'alternate_wins': 0,
+    'grace_wins': 0,
+    'failures': 0,
+    'wasted_calls': 0
+}
+
+def is_acceptable_answer(answer: str) -> bool:
+    """Check whether an agent answer can be returned to the user"""
+    return bool(answer and answer.strip()) and not answer.startswith(LLM_ERROR_PREFIX)
+
+def get_speculative_executor() -> ThreadPoolExecutor:
+    """Create the shared pool for speculative agent runs on first use"""
+    global speculative_executor
+    with speculative_lock:
+        if speculative_executor is None:
+            speculative_executor = ThreadPoolExecutor(
+                max_workers=SPECULATIVE_MAX_WORKERS,
+                thread_name_prefix="speculative-agent"
+            )
+    return speculative_executor
+
+def record_speculation(outcome: str, wasted_calls: int) -> None:
+    """Update speculation hit/waste counters"""
+    with speculative_lock:
+        speculation_stats['runs'] += 1
+        speculation_stats[outcome] += 1
+        speculation_stats['wasted_calls'] += wasted_calls
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """Speculation counters with hit and waste ratios"""
+    with speculative_lock:
+        stats = dict(speculation_stats)
+    runs = stats['runs']
+    # A hit is a run where the alternate agent supplied the answer we returned
+    stats['hit_ratio'] = round(stats['alternate_wins'] / runs, 3) if runs else 0.0
+    # Waste is the share of started agent calls whose answer was thrown away
+    stats['waste_ratio'] = round(stats['wasted_calls'] / (2 * runs), 3) if runs else 0.0
+    stats['enabled'] = SPECULATIVE_AGENTS
+    return stats
+
+def get_speculative_agent_response(user_input: str, agent_type: str) -> str:
+    """One speculative agent run, profiled on its pool thread when the request is profiled"""
+    with profile_request(f"speculative {agent_type}"):
+        return get_crewai_response(user_input, agent_type, None, "speculative")
+
+def get_speculative_response(user_input: str, agent_types: List[str]) -> str:
+    """Run the top two candidate agents concurrently and keep the best timely answer"""
+    preferred, alternate = agent_types[0], agent_types[1]
+    start = time.perf_counter()
+    executor = get_speculative_executor()
+    parent_token = current_cancel_token.get()
+    cancel_tokens = {
+        agent_type: parent_token.child() if parent_token is not None else CancelToken()
+        for agent_type in (preferred, alternate)
     }
     
-    # Check for exact matches first
-    for question, answer in mock_responses.items():
-        if question in user_input_lower:
-            return answer
+    def submit(agent_type: str):
+        # Each run gets a copy of the request context (so its token usage is attributed to this
+        # request) with its own cancel token, so the loser can be stopped without the winner
+        context = contextvars.copy_context()
+        context.run(current_cancel_token.set, cancel_tokens[agent_type])
+        return executor.submit(context.run, get_speculative_agent_response, user_input, agent_type)
     
-    # Check for partial matches with better logic
-    for question, answer in mock_responses.items():
-        question_words = question.split()
-        input_words = user_input_lower.split()
-        
-        # Check if key words from the question are in the input
-        if any(word in user_input_lower for word in question_words if len(word) > 2):
-            return answer
+    futures = {preferred: submit(preferred), alternate: submit(alternate)}
+    answers = {}
+    
+    def collect(done) -> None:
+        for agent_type, future in futures.items():
+            if future in done and agent_type not in answers:
+                try:
+                    answers[agent_type] = future.result()
+                except Exception as e:
+                    answers[agent_type] = f"{CREWAI_ERROR_PREFIX}: {str(e)}"
     
-    # Check for specific technology mentions
-    if "python" in user_input_lower:
-        return mock_responses["what is python"]
-    elif "javascript" in user_input_lower or "js" in user_input_lower:
-        return mock_responses["what is javascript"]
-    elif "react" in user_input_lower:
-        return mock_responses["what is react"]
-    elif "aws" in user_input_lower or "amazon" in user_input_lower:
-        return mock_responses["what is aws"]
-    elif "azure" in user_input_lower or "microsoft" in user_input_lower:
-        return mock_responses["what is azure"]
-    elif "devops" in user_input_lower:
-        return mock_responses["what is devops"]
-    elif "kubernetes" in user_input_lower or "k8s" in user_input_lower:
-        return mock_responses["what is kubernetes"]
-    elif "terraform" in user_input_lower:
-        return mock_responses["what is terraform"]
+    chosen = None
+    outcome = 'failures'
+    pending = set(futures.values())
+    while pending and chosen is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        collect(done)
+        if is_acceptable_answer(answers.get(preferred)):
+            chosen, outcome = preferred, 'preferred_wins'
+        elif is_acceptable_answer(answers.get(alternate)):
+            # The alternate finished first - give the preferred agent a grace window
+            if preferred not in answers:
+                done, pending = wait(pending, timeout=SPECULATIVE_GRACE_SECONDS)
+                collect(done)
+            if is_acceptable_answer(answers.get(preferred)):
+                chosen, outcome = preferred, 'grace_wins'
+            else:
+                chosen, outcome = alternate, 'alternate_wins'
+    
+    # Stop the loser: a run that has not started is dropped and wastes nothing,
+    # a running one stops at its next crew step, a finished one's answer is discarded
+    wasted_calls = 0
+    for agent_type, future in futures.items():
+        if chosen is None or agent_type == chosen or future.cancel():
+            continue
+        cancel_tokens[agent_type].cancel(SUPERSEDED)
+        wasted_calls += 1
+    record_speculation(outcome, wasted_calls)
+    # Agent calls ran on pool threads, so the step is recorded here on the request thread
+    add_step('speculation', preferred=preferred, alternate=alternate, outcome=outcome, chosen=chosen,
+             latency_ms=round((time.perf_counter() - start) * 1000, 2))
     
-    # Default response
-    return "I can help you with information about programming languages, cloud platforms, and development tools. For specific questions about SkillCapital courses, I can provide detailed information about Python, DevOps, AWS, Azure, React, and other technologies we offer."
+    if chosen is None:
+        return answers.get(preferred) or answers.get(alternate, "")
+    return answers[chosen]
 
-def get_chat_response(user_input: str) -> str:
-    """Get chat response for API calls"""
+def get_metrics() -> Dict[str, Any]:
+    """Collect runtime metrics for the health check endpoint"""
+    return {
+        'speculation': get_speculation_stats(),
+        'agents': agent_registry.stats(),
+        'tokens': usage_tracker.snapshot(),
+        'budgets': budget_manager.snapshot(),
+        'site_snapshot': site_snapshot.stats(),
+        'offline_answers': core.faq_answers.stats(),
+        'scheduler': request_scheduler.stats(),
+        'cancellation': get_cancellation_stats(),
+        'event_log': event_logger.stats()
+    }
+
+def get_mock_response(user_input: str) -> Optional[str]:
+    """Answer from the offline FAQ index when the LLM providers are unavailable; None if nothing matches well"""
+    match = get_offline_answer(user_input)
+    if match is None:
+        return None
+    add_step('offline_answer', question=match['question'], confidence=match['confidence'])
+    return match['answer']
+
+def answer_chat_request(user_input: str, on_token: Optional[Callable[[str], None]] = None,
+                        route: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Route a chat message (unless already routed) and produce the answer along with its route"""
+    route = dict(route) if route else {'route': 'error'}
     try:
         # Clean user input to prevent encoding issues
         user_input = clean_text(user_input)
-        user_input_lower = user_input.lower().strip()
-        
-        # Handle greetings
-        if any(word in user_input_lower for word in ['hello', 'hi', 'hey']):
-            return get_greeting_response(user_input)
+        if route['route'] == 'error':
+            route = route_query(user_input)
+        record(**{key: value for key, value in route.items() if key != 'answer'})
         
-        # Handle price queries
-        if any(word in user_input_lower for word in ['price', 'cost', 'how much']):
-            return get_price_response(user_input)
-        
-        # Handle duration queries
-        if any(word in user_input_lower for word in ['duration', 'how long', 'time']):
-            return get_duration_response(user_input)
-        
-        # Handle course content queries
-        if any(word in user_input_lower for word in ['course', 'content', 'curriculum', 'modules']):
-            courses = course_data.get('courses', {})
-            
-            # Check for specific course mentions
-            for course_key in courses:
-                if course_key in user_input_lower:
-                    return get_course_content(course_key)
-            
-            # Check for AWS/Azure variations
-            if any(word in user_input_lower for word in ['aws', 'amazon', 'cloud']):
-                for key, course in courses.items():
-                    if 'aws' in key or 'cloud' in key:
-                        return get_course_content(key)
-                return get_all_courses()
-            
-            if any(word in user_input_lower for word in ['azure', 'microsoft']):
-                for key, course in courses.items():
-                    if 'azure' in key:
-                        return get_course_content(key)
-                return get_all_courses()
-            
-            # Check for React.js variations
-            if any(word in user_input_lower for word in ['react', 'reactjs', 'react.js', 'javascript', 'js']):
-                for key, course in courses.items():
-                    if 'react' in key or 'javascript' in key:
-                        return get_course_content(key)
-                
-                # Special handling for "react js" course
-                if 'react js' in courses:
-                    return get_course_content('react js')
-                return get_all_courses()
-            
-            # If no specific course mentioned, return all courses
-            return get_all_courses()
-        
-        # Determine the type of query and use appropriate CrewAI agent
-        technical_keywords = ['programming', 'code', 'development', 'software', 'algorithm', 'database', 'api', 'framework', 'python', 'javascript', 'react', 'aws', 'azure']
-        research_keywords = ['what is', 'what are', 'how does', 'explain', 'tell me about', 'define', 'describe', 'research']
-        enrollment_keywords = ['enroll', 'sign up', 'register', 'join', 'start course', 'how to join', 'enrollment', 'admission']
-        
-        is_technical = any(keyword in user_input_lower for keyword in technical_keywords)
-        is_research = any(keyword in user_input_lower for keyword in research_keywords)
-        is_enrollment = any(keyword in user_input_lower for keyword in enrollment_keywords)
-        is_skillcapital = is_skillcapital_related(user_input)
+        if route.get('answer') is not None:
+            response = route.pop('answer')
+            return dict(route, response=response)
         
         # Use CrewAI for different types of queries
         try:
-            if is_enrollment:
-                # Use enrollment agent for enrollment queries
-                response = get_crewai_response(user_input, "enrollment")
-                return response
-            elif is_skillcapital:
-                # Use advisor agent for SkillCapital queries
-                response = get_crewai_response(user_input, "advisor")
-                return response
-            elif is_technical:
-                # Use technical agent for programming/technical queries
-                response = get_crewai_response(user_input, "technical")
-                return response
-            elif is_research:
-                # Use research agent for general research queries
-                response = get_crewai_response(user_input, "research")
-                return response
+            if route['route'] == 'speculative':
+                response = get_speculative_response(user_input, route['candidates'])
+            elif route['route'] == 'agent':
+                response = get_crewai_response(user_input, route['agent'], on_token=on_token)
             else:
-                # Fallback to ChatGPT for other queries
-                try:
-                    response = get_chatgpt_response(user_input)
-                    return response
-                except Exception as e:
-                    # Fallback to a simple response if ChatGPT fails
-                    return "I can help you with general questions, but I'm best at answering questions about SkillCapital courses. Try asking about Python, DevOps, AWS, Azure, or React.js courses!"
+                response = get_chatgpt_response(user_input, on_token=on_token)
+                if not is_acceptable_answer(response):
+                    # Fallback to an offline answer, then a simple response, if ChatGPT fails
+                    add_step('fallback', target='offline', error=response)
+                    response = get_mock_response(user_input) or "I can help you with general questions, but I'm best at answering questions about SkillCapital courses. Try asking about Python, DevOps, AWS, Azure, or React.js courses!"
+                return dict(route, response=response)
+            
+            # Agent failures go through the same fallbacks as exceptions
+            if not is_acceptable_answer(response):
+                raise RuntimeError(response)
+            return dict(route, response=response)
         except Exception as e:
             # Fallback for CrewAI failures - use ChatGPT instead
+            add_step('fallback', target='chatgpt', error=str(e))
             try:
                 # Try ChatGPT as fallback
-                response = get_chatgpt_response(user_input)
-                return response
+                response = get_chatgpt_response(user_input, on_token=on_token, route="fallback")
+                if not is_acceptable_answer(response):
+                    raise RuntimeError(response)
+                return dict(route, response=response)
             except Exception as chatgpt_error:
-                # Final fallback to mock response
+                # Final fallback to the offline FAQ answers
+                add_step('fallback', target='offline', error=str(chatgpt_error))
                 mock_response = get_mock_response(user_input)
-                if mock_response and "I can help you with information" not in mock_response:
-                    return mock_response
+                if mock_response:
+                    return dict(route, response=mock_response)
                 else:
                     # Show course information as final fallback
-                    return f"I'm having trouble processing that request. Let me provide you with information about our courses instead.\n{get_all_courses()}\nYou can ask about specific courses like Python, DevOps, AWS, Azure, or React.js!"
+                    return dict(route, response=f"I'm having trouble processing that request. Let me provide you with information about our courses instead.\n{get_all_courses()}\nYou can ask about specific courses like Python, DevOps, AWS, Azure, or React.js!")
                 
     except Exception as e:
-        return f"Sorry, I encountered an error: {str(e)}. Please try asking about SkillCapital courses like Python, DevOps, AWS, or React.js!"
+        return dict(route, response=f"Sorry, I encountered an error: {str(e)}. Please try asking about SkillCapital courses like Python, DevOps, AWS, or React.js!")
+
+def get_chat_result(user_input: str, on_token: Optional[Callable[[str], None]] = None, source: str = "api",
+                    route: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get the chat response together with its route, latency and token usage"""
+    start = time.perf_counter()
+    calls = []
+    usage_token = request_usage.set(calls)
+    try:
+        with profile_request('get_chat_response'), request_event(user_input, source=source):
+            result = answer_chat_request(user_input, on_token=on_token, route=route)
+            result['usage'] = summarize_usage(calls)
+            record(usage={key: value for key, value in result['usage'].items() if key != 'calls'})
+    finally:
+        request_usage.reset(usage_token)
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+# Keeps multi-second LLM requests from starving instant answers on a shared server
+request_scheduler = RequestScheduler(LLM_WORKERS, LLM_MAX_QUEUE, LLM_MAX_QUEUE_PER_CLIENT)
+
+def new_cancel_token() -> CancelToken:
+    """Cancel token carrying the configured LLM request deadline"""
+    return CancelToken(time.monotonic() + LLM_REQUEST_DEADLINE if LLM_REQUEST_DEADLINE > 0 else None)
+
+def estimate_route_tokens(route: Dict[str, Any]) -> int:
+    """Output token budget of the LLM calls a route would make"""
+    if route['route'] == 'speculative':
+        return sum(budget_manager.limits(agent_registry.resolve(agent))['max_tokens'] for agent in route['candidates'][:2])
+    if route['route'] == 'agent':
+        return budget_manager.limits(agent_registry.resolve(route['agent']))['max_tokens']
+    return budget_manager.limits("chatgpt")['max_tokens']
+
+def get_scheduled_chat_result(user_input: str, client_id: str = "anonymous", source: str = "api",
+                              connection=None) -> Dict[str, Any]:
+    """Route a request, answer deterministic routes inline and queue LLM work fairly per client.
+
+    Raises scheduler.SchedulerBusy when the LLM lane's queue limits are reached, and
+    cancellation.RequestCancelled when the client's connection (if given) closes or the
+    LLM_REQUEST_DEADLINE passes first; the LLM slot is released right away.
+    """
+    # Routing runs here and the answer possibly on an LLM lane thread; each is profiled on its own thread
+    with profile_request('route_query'):
+        route = route_query(clean_text(user_input))
+    lane = FAST_LANE if route.get('answer') is not None else LLM_LANE
+    if lane == FAST_LANE:
+        result = request_scheduler.run(lane, client_id, get_chat_result, user_input, source=source, route=route)
+        result['lane'] = lane
+        return result
+    
+    token = new_cancel_token()
+    # The request context (token usage, event log, cancel token) follows the job onto the LLM lane's thread
+    context = contextvars.copy_context()
+    context.run(current_cancel_token.set, token)
+    started = threading.Event()
+    
+    def run_job() -> Dict[str, Any]:
+        started.set()
+        return context.run(get_chat_result, user_input, source=source, route=route)
+    
+    try:
+        with disconnect_watcher.watch(connection, token):
+            result = request_scheduler.run(lane, client_id, run_job, cancel_token=token)
+    except RequestCancelled as e:
+        # Work cancelled while queued never started, so its whole budget is saved
+        record_cancellation(e.reason, 0 if started.is_set() else estimate_route_tokens(route))
+        raise
+    result['lane'] = lane
+    return result
+
+def get_chat_response(user_input: str) -> str:
+    """Get chat response for API calls"""
+    return get_chat_result(user_input)['response']
+
+class TokenPrinter:
+    """Prints streamed tokens as they arrive, or the full answer if the stream did not deliver it"""
+    
+    def __init__(self):
+        self.streamed = False
+        self.printed: List[str] = []
+    
+    def __call__(self, token: str) -> None:
+        if not self.streamed:
+            self.streamed = True
+            sys.stdout.write("SkillCapital: ")
+        self.printed.append(token)
+        try:
+            sys.stdout.write(token)
+        except UnicodeEncodeError:
+            sys.stdout.write(token.encode('ascii', errors='replace').decode('ascii'))
+        sys.stdout.flush()
+    
+    def finish(self, response: str) -> None:
+        if self.streamed:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            # A stream that broke off, or was followed by a fallback's, is not the answer
+            if "".join(self.printed).strip() == response.strip():
+                return
+        safe_print(f"SkillCapital: {response}")
 
 def run_chatbot():
     """Main chatbot function"""
@@ -594,127 +747,16 @@ def run_chatbot():
             if not user_input:
                 continue
             
-            # Clean user input to prevent encoding issues
-            user_input = clean_text(user_input)
-            user_input_lower = user_input.lower().strip()
-            
             # Handle exit commands
+            user_input_lower = clean_text(user_input).lower()
             if any(word in user_input_lower for word in ['exit', 'quit', 'bye', 'goodbye']):
                 safe_print("SkillCapital: Thank You 'Happy Learning'!")
                 break
             
-            # Handle greetings
-            if any(word in user_input_lower for word in ['hello', 'hi', 'hey']):
-                safe_print(f"SkillCapital: {get_greeting_response(user_input)}")
-                continue
-            
-            # Handle price queries
-            if any(word in user_input_lower for word in ['price', 'cost', 'how much']):
-                safe_print(f"SkillCapital: {get_price_response(user_input)}")
-                continue
-            
-            # Handle duration queries
-            if any(word in user_input_lower for word in ['duration', 'how long', 'time']):
-                safe_print(f"SkillCapital: {get_duration_response(user_input)}")
-                continue
-            
-            # Handle course content queries
-            if any(word in user_input_lower for word in ['course', 'content', 'curriculum', 'modules']):
-                courses = course_data.get('courses', {})
-                
-                # Check for specific course mentions
-                for course_key in courses:
-                    if course_key in user_input_lower:
-                        safe_print(f"SkillCapital: {get_course_content(course_key)}")
-                        break
-                else:
-                    # Check for AWS/Azure variations
-                    if any(word in user_input_lower for word in ['aws', 'amazon', 'cloud']):
-                        for key, course in courses.items():
-                            if 'aws' in key or 'cloud' in key:
-                                safe_print(f"SkillCapital: {get_course_content(key)}")
-                                break
-                        else:
-                            safe_print(f"SkillCapital: {get_all_courses()}")
-                        continue
-                    
-                    if any(word in user_input_lower for word in ['azure', 'microsoft']):
-                        for key, course in courses.items():
-                            if 'azure' in key:
-                                safe_print(f"SkillCapital: {get_course_content(key)}")
-                                break
-                        else:
-                            safe_print(f"SkillCapital: {get_all_courses()}")
-                        continue
-                    
-                    # Check for React.js variations
-                    if any(word in user_input_lower for word in ['react', 'reactjs', 'react.js', 'javascript', 'js']):
-                        for key, course in courses.items():
-                            if 'react' in key or 'javascript' in key:
-                                safe_print(f"SkillCapital: {get_course_content(key)}")
-                                break
-                        else:
-                            # Special handling for "react js" course
-                            if 'react js' in courses:
-                                safe_print(f"SkillCapital: {get_course_content('react js')}")
-                            else:
-                                safe_print(f"SkillCapital: {get_all_courses()}")
-                        continue
-                    
-                    # If no specific course mentioned, return all courses
-                    safe_print(f"SkillCapital: {get_all_courses()}")
-                continue
-            
-            # Determine the type of query and use appropriate CrewAI agent
-            technical_keywords = ['programming', 'code', 'development', 'software', 'algorithm', 'database', 'api', 'framework', 'python', 'javascript', 'react', 'aws', 'azure']
-            research_keywords = ['what is', 'what are', 'how does', 'explain', 'tell me about', 'define', 'describe', 'research']
-            
-            is_technical = any(keyword in user_input_lower for keyword in technical_keywords)
-            is_research = any(keyword in user_input_lower for keyword in research_keywords)
-            is_skillcapital = is_skillcapital_related(user_input)
-            
-            # Use CrewAI for different types of queries
-            try:
-                if is_skillcapital:
-                    # Use advisor agent for SkillCapital queries
-                    response = get_crewai_response(user_input, "advisor")
-                    safe_print(f"SkillCapital: {response}")
-                elif is_technical:
-                    # Use technical agent for programming/technical queries
-                    response = get_crewai_response(user_input, "technical")
-                    safe_print(f"SkillCapital: {response}")
-                elif is_research:
-                    # Use research agent for general research queries
-                    response = get_crewai_response(user_input, "research")
-                    safe_print(f"SkillCapital: {response}")
-                else:
-                    # Fallback to ChatGPT for other queries
-                    try:
-                        response = get_chatgpt_response(user_input)
-                        safe_print(f"SkillCapital: {response}")
-                    except Exception as e:
-                        # Fallback to a simple response if ChatGPT fails
-                        safe_print("SkillCapital: I can help you with general questions, but I'm best at answering questions about SkillCapital courses. Try asking about Python, DevOps, AWS, Azure, or React.js courses!")
-            except Exception as e:
-                # Fallback for CrewAI failures - use ChatGPT instead
-                print(f"DEBUG: CrewAI Fallback - {str(e)}")
-                try:
-                    # Try ChatGPT as fallback
-                    response = get_chatgpt_response(user_input)
-                    safe_print(f"SkillCapital: {response}")
-                except Exception as chatgpt_error:
-                    # Final fallback to mock response
-                    print(f"DEBUG: ChatGPT Fallback - {str(chatgpt_error)}")
-                    
-                    # Try mock response for general questions
-                    mock_response = get_mock_response(user_input)
-                    if mock_response and "I can help you with information" not in mock_response:
-                        safe_print(f"SkillCapital: {mock_response}")
-                    else:
-                        # Show course information as final fallback
-                        safe_print("SkillCapital: I'm having trouble processing that request. Let me provide you with information about our courses instead.")
-                        safe_print(f"SkillCapital: {get_all_courses()}")
-                        safe_print("SkillCapital: You can ask about specific courses like Python, DevOps, AWS, Azure, or React.js!")
+            # Same router as the API, printing tokens as they stream in
+            printer = TokenPrinter()
+            result = get_chat_result(user_input, on_token=printer, source="cli")
+            printer.finish(result['response'])
                 
         except KeyboardInterrupt:
             safe_print("\nSkillCapital: Thank You 'Happy Learning'!")
@@ -723,7 +765,6 @@ def run_chatbot():
             # More detailed error handling
             error_type = type(e).__name__
             error_msg = str(e)
-            print(f"DEBUG: Main Error - Type: {error_type}, Message: {error_msg}")
             safe_print(f"SkillCapital: An error occurred: {error_type} - {error_msg}")
             safe_print("SkillCapital: Please try asking about SkillCapital courses like Python, DevOps, AWS, or React.js!")
     
@@ -732,9 +773,92 @@ def run_chatbot():
         observer.stop()
         observer.join()
 
+def read_batch_queries(path: str) -> List[str]:
+    """Read batch queries from a text file (one per line), JSONL (query/message field) or stdin"""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = list(iter_log_lines(path))
+    
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            # JSONL input, including event log files from EVENT_LOG_DIR
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                queries.append(line)
+                continue
+            query = entry.get('query') or entry.get('message')
+            if query:
+                queries.append(query)
+        else:
+            queries.append(line)
+    return queries
+
+def run_batch(input_path: str, output_path: str = '-', concurrency: int = 4) -> Dict[str, Any]:
+    """Answer queries from a file or stdin concurrently and write JSONL results with timings"""
+    queries = read_batch_queries(input_path)
+    output = sys.stdout if output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    latencies = []
+    errors = 0
+    
+    def run_one(index: int, query: str) -> Dict[str, Any]:
+        try:
+            result = get_chat_result(query, source="batch")
+        except Exception as e:
+            result = {'route': 'error', 'response': None, 'error': f"{type(e).__name__}: {str(e)}", 'latency_ms': None}
+        result.update(index=index, query=query)
+        return result
+    
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as executor:
+            futures = [executor.submit(run_one, index, query) for index, query in enumerate(queries)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result.get('error'):
+                    errors += 1
+                elif result.get('latency_ms') is not None:
+                    latencies.append(result['latency_ms'])
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    summary = {
+        'queries': len(queries),
+        'errors': errors,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_qps': round(len(queries) / elapsed, 2) if elapsed > 0 else 0.0,
+        'p50_ms': latencies[len(latencies) // 2] if latencies else None,
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return summary
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options for the chatbot"""
+    parser = argparse.ArgumentParser(description=CHATBOT_NAME)
+    parser.add_argument('--batch', metavar='PATH', help="answer queries from PATH (text, JSONL or event log; '-' for stdin) instead of chatting")
+    parser.add_argument('--output', metavar='PATH', default='-', help="where batch results are written as JSONL (default: stdout)")
+    parser.add_argument('--concurrency', type=int, default=4, help="number of batch queries processed at once (default: 4)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        run_chatbot()
+        if args.batch:
+            run_batch(args.batch, args.output, args.concurrency)
+        else:
+            run_chatbot()
     except KeyboardInterrupt:
         safe_print("\nSkillCapital: Thank You 'Happy Learning'!")
     except Exception as e:
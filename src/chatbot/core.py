@@ -0,0 +1,201 @@
+"""Dependency-free chatbot core shared by the lightweight and full API functions.
+
+Holds text normalization, the course catalog and the course index, the static
+answers and the router. Nothing here may import crewai, langchain or openai,
+so the fast Vercel function can bundle it without the LLM stack.
+"""
+import os
+import sys
+from typing import Dict, Any, List, Optional
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_path)
+
+from config import OPENAI_MODEL, OPENAI_TEMPERATURE, COURSE_MATCH_THRESHOLD, SPECULATIVE_AGENTS, AGENTS_FILE
+from config import COURSE_CATALOG_PATHS, COURSE_PAGE_SIZE, FAQ_PATHS, OFFLINE_ANSWER_MIN_CONFIDENCE
+from course_index import CourseIndex
+from catalog import CourseCatalog
+from offline_answers import OfflineAnswers
+from agent_registry import AgentRegistry
+
+# Routes that are answered locally without an LLM call
+DETERMINISTIC_ROUTES = ('greeting', 'price', 'duration', 'course', 'course_list')
+
+def safe_print(message: str) -> None:
+    """Safely print messages with proper encoding"""
+    try:
+        print(message)
+    except UnicodeEncodeError:
+        # Fallback to ASCII-safe printing
+        safe_message = message.encode('ascii', errors='replace').decode('ascii')
+        print(safe_message)
+
+def clean_text(text: str) -> str:
+    """Clean text to ensure ASCII compatibility"""
+    if not isinstance(text, str):
+        return str(text)
+    try:
+        # Try to encode as ASCII, replacing problematic characters
+        return text.encode('ascii', errors='replace').decode('ascii')
+    except UnicodeError:
+        # If that fails, try a more aggressive cleaning
+        return ''.join(char for char in text if ord(char) < 128)
+
+def build_course_index(catalog: CourseCatalog) -> CourseIndex:
+    """Build the typo-tolerant course name index"""
+    return CourseIndex(catalog.courses, threshold=COURSE_MATCH_THRESHOLD)
+
+# Load the course catalog
+catalog = CourseCatalog(COURSE_CATALOG_PATHS)
+course_index = build_course_index(catalog)
+
+# Ranked FAQ answers for when no LLM is reachable
+faq_answers = OfflineAnswers(FAQ_PATHS, min_confidence=OFFLINE_ANSWER_MIN_CONFIDENCE)
+
+# Agent definitions are needed for routing; the agents themselves are only built by chatbot.py
+agent_registry = AgentRegistry(AGENTS_FILE, {
+    'model': OPENAI_MODEL,
+    'temperature': OPENAI_TEMPERATURE
+})
+
+def reload_course_data() -> None:
+    """Reload changed catalog and FAQ files and rebuild the course index if anything changed"""
+    global course_index
+    if catalog.reload():
+        course_index = build_course_index(catalog)
+    faq_answers.reload()
+
+def get_offline_answer(user_input: str) -> Optional[Dict[str, Any]]:
+    """Best FAQ answer for a question if it clears the confidence threshold"""
+    return faq_answers.answer(user_input)
+
+def get_greeting_response(user_input: str) -> str:
+    """Get greeting response"""
+    user_input_clean = user_input.lower().strip()
+    greeting_responses = catalog.site.get('greeting_responses', {})
+
+    for greeting, response in greeting_responses.items():
+        if greeting in user_input_clean:
+            return response
+
+    return "👋 Hi! Welcome to SkillCapital - India's #1 Premium Training Platform! How can I assist you today?"
+
+def get_price_response(user_input: str) -> str:
+    """Get price information"""
+    return "₹ 999 for premium AI-driven training"
+
+def get_duration_response(user_input: str) -> str:
+    """Get duration information"""
+    return "30 Hours of comprehensive training"
+
+def get_course_content(course_name: str) -> str:
+    """Get specific course content"""
+    # Find course by name (case insensitive)
+    course_name_lower = course_name.lower().strip()
+    course = catalog.get(course_name_lower)
+    if course is not None:
+        return format_course_content(course)
+
+    # Resolve aliases and misspellings through the course index
+    match = course_index.resolve(course_name_lower)
+    if match and match.course_key in catalog:
+        return format_course_content(catalog.get(match.course_key))
+
+    return "Course not found. Please check the course name."
+
+def format_course_content(course: dict) -> str:
+    """Format course content for display"""
+    name = course.get('name', 'Unknown Course')
+    modules = course.get('modules', [])
+
+    if not modules:
+        return f"Course: {name}\nNo modules available."
+
+    formatted_modules = "\n".join([f"• {module}" for module in modules])
+    return f"Course: {name}\nModules:\n{formatted_modules}"
+
+def list_courses(category: Optional[str] = None, keyword: Optional[str] = None,
+                 page: int = 1, page_size: int = COURSE_PAGE_SIZE) -> Dict[str, Any]:
+    """One page of the course catalog, optionally filtered by category or keyword"""
+    return catalog.list_courses(category=category, keyword=keyword, page=page, page_size=page_size)
+
+def get_all_courses(category: Optional[str] = None, page: int = 1) -> str:
+    """Get the first page of available courses, optionally for one category"""
+    listing = list_courses(category=category, page=page)
+    if not listing['items']:
+        return "No courses available."
+
+    course_list = [f"• {item['name']}" for item in listing['items']]
+    title = f"Available {category} Courses" if category else "Available Courses"
+    text = f"{title}:\n" + "\n".join(course_list)
+
+    # Large catalogs are listed a page at a time
+    if listing['pages'] > 1:
+        shown_from = (listing['page'] - 1) * listing['page_size'] + 1
+        shown_to = shown_from + len(listing['items']) - 1
+        categories = ", ".join(catalog.categories())
+        text += f"\nShowing {shown_from}-{shown_to} of {listing['total']} courses."
+        if categories and not category:
+            text += f" Ask about a category to narrow it down: {categories}."
+    return text
+
+def is_skillcapital_related(user_input: str) -> bool:
+    """Check if the user input is related to SkillCapital"""
+    skillcapital_keywords = agent_registry.keywords("advisor")
+
+    user_input_lower = user_input.lower().strip()
+    return any(keyword in user_input_lower for keyword in skillcapital_keywords)
+
+def rank_agent_types(user_input: str) -> List[str]:
+    """Return the candidate agent types for a query, most preferred first"""
+    user_input_lower = user_input.lower().strip()
+    return [
+        agent_type for agent_type in agent_registry.agent_types()
+        if any(keyword in user_input_lower for keyword in agent_registry.keywords(agent_type))
+    ]
+
+def route_query(user_input: str) -> Dict[str, Any]:
+    """Decide how a message is answered; deterministic routes carry their answer"""
+    user_input_lower = user_input.lower().strip()
+
+    # Handle greetings
+    if any(word in user_input_lower for word in ['hello', 'hi', 'hey']):
+        return {'route': 'greeting', 'answer': get_greeting_response(user_input)}
+
+    # Handle price queries
+    if any(word in user_input_lower for word in ['price', 'cost', 'how much']):
+        return {'route': 'price', 'answer': get_price_response(user_input)}
+
+    # Handle duration queries
+    if any(word in user_input_lower for word in ['duration', 'how long', 'time']):
+        return {'route': 'duration', 'answer': get_duration_response(user_input)}
+
+    # Handle course content queries
+    if any(word in user_input_lower for word in ['course', 'content', 'curriculum', 'modules']):
+        # Check for specific course mentions, tolerating typos and aliases
+        match = course_index.resolve(user_input_lower)
+        if match:
+            return {
+                'route': 'course',
+                'course': match.course_key,
+                'match_score': match.score,
+                'answer': get_course_content(match.course_key)
+            }
+
+        # If no specific course mentioned, list the courses of the category asked about, or all of them
+        category = catalog.match_category(user_input_lower)
+        if category:
+            return {'route': 'course_list', 'category': category, 'answer': get_all_courses(category=category)}
+        return {'route': 'course_list', 'answer': get_all_courses()}
+
+    # Determine the type of query and use appropriate CrewAI agent
+    agent_types = rank_agent_types(user_input)
+    if SPECULATIVE_AGENTS and len(agent_types) > 1:
+        # Ambiguous query - race the top two candidate agents
+        return {'route': 'speculative', 'agent': agent_types[0], 'candidates': agent_types}
+    if agent_types:
+        # Enrollment, advisor, technical and research agents in order of precedence
+        return {'route': 'agent', 'agent': agent_types[0], 'candidates': agent_types}
+
+    # Fallback to ChatGPT for other queries
+    return {'route': 'chatgpt'}
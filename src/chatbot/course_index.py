@@ -0,0 +1,172 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Any, List, NamedTuple, Optional
+
+# Words that show up around course mentions but never name a course
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'in', 'on', 'to', 'with', 'about',
+    'me', 'my', 'i', 'is', 'are', 'what', 'which', 'show', 'tell', 'give', 'list',
+    'course', 'courses', 'content', 'contents', 'curriculum', 'module', 'modules',
+    'syllabus', 'details', 'info', 'information', 'please', 'your', 'do', 'you', 'have'
+}
+
+# Tokens shorter than this are only matched exactly (e.g. "js", "sre", "aws")
+MIN_FUZZY_LENGTH = 4
+# Minimum trigram Dice similarity for a term to be considered a typo candidate
+MIN_DICE = 0.3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#/]*")
+
+
+class CourseMatch(NamedTuple):
+    """A course resolved from free text"""
+    course_key: str
+    term: str
+    score: float
+
+
+def normalize_term(text: str) -> str:
+    """Lowercase text and reduce it to space separated tokens"""
+    return " ".join(tokenize(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase tokens, keeping names like react.js and ui/ux intact"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip('.')
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def trigrams(text: str) -> List[str]:
+    """Padded character trigrams of a term"""
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+
+class CourseIndex:
+    """Trigram index over course keys, names and aliases for typo-tolerant lookups"""
+
+    def __init__(self, courses: Dict[str, Any], threshold: float = 0.75, max_candidates: int = 10):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.terms: List[str] = []
+        self.term_courses: List[List[str]] = []
+        self.term_gram_counts: List[int] = []
+        self.term_ids: Dict[str, int] = {}
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.max_words = 1
+
+        for key, course in courses.items():
+            names = [key, course.get('name', '')] + list(course.get('aliases', []))
+            for name in names:
+                self.add_term(name, key)
+
+    def add_term(self, text: str, course_key: str) -> None:
+        """Register a term that refers to a course"""
+        term = normalize_term(text)
+        if not term:
+            return
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.term_ids[term] = term_id
+            self.terms.append(term)
+            self.term_courses.append([])
+            grams = set(trigrams(term))
+            self.term_gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(term_id)
+            self.max_words = max(self.max_words, len(term.split()))
+        if course_key not in self.term_courses[term_id]:
+            self.term_courses[term_id].append(course_key)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, phrase: str) -> Optional[CourseMatch]:
+        """Resolve a single phrase to its closest course term"""
+        phrase = normalize_term(phrase)
+        term_id = self.term_ids.get(phrase)
+        if term_id is not None:
+            return CourseMatch(self.term_courses[term_id][0], phrase, 1.0)
+        if len(phrase) < MIN_FUZZY_LENGTH:
+            return None
+
+        # Candidate generation: count shared trigrams through the posting lists
+        # (Counter counts in C, which matters once the catalog has thousands of terms)
+        phrase_grams = set(trigrams(phrase))
+        overlap = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in phrase_grams))
+
+        # Rank by Dice similarity, not raw overlap: a long term sharing the same trigrams
+        # must not crowd the short correct term out of the candidates
+        phrase_size = len(phrase_grams)
+        gram_counts = self.term_gram_counts
+        # A term has at least `shared` trigrams, so dice >= MIN_DICE needs shared >= this bound
+        min_shared = MIN_DICE * phrase_size / (2.0 - MIN_DICE)
+        candidates = heapq.nlargest(
+            self.max_candidates,
+            ((2.0 * shared / (phrase_size + gram_counts[term_id]), term_id)
+             for term_id, shared in overlap.items() if shared >= min_shared)
+        )
+
+        max_distance = int(len(phrase) * (1 - self.threshold))
+        best = None
+        for dice, candidate in candidates:
+            if dice < MIN_DICE:
+                break
+            term = self.terms[candidate]
+            distance = edit_distance(phrase, term, max_distance)
+            if distance > max_distance:
+                continue
+            score = 1.0 - distance / max(len(phrase), len(term))
+            if score >= self.threshold and (best is None or score > best.score):
+                best = CourseMatch(self.term_courses[candidate][0], term, round(score, 3))
+        return best
+
+    def resolve(self, text: str) -> Optional[CourseMatch]:
+        """Find the course mentioned in free text, preferring longer and closer matches"""
+        tokens = tokenize(text)
+        best = None
+        best_length = 0
+        for size in range(min(self.max_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                window = tokens[start:start + size]
+                if window[0] in STOPWORDS or window[-1] in STOPWORDS:
+                    continue
+                phrase = " ".join(window)
+                match = self.lookup(phrase)
+                if match is None:
+                    continue
+                if best is None or (match.score, len(phrase)) > (best.score, best_length):
+                    best = match
+                    best_length = len(phrase)
+            if best is not None and best.score == 1.0:
+                break
+        return best
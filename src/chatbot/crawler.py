@@ -0,0 +1,324 @@
+"""Crawl the SkillCapital website into the local knowledge snapshot.
+
+Usage: python src/chatbot/crawler.py [--seed URL] [--max-pages 200]
+
+Pages are fetched with bounded concurrency and at most one request per
+host every CRAWL_HOST_DELAY seconds (or the robots.txt Crawl-delay, if
+longer). Pages already in the snapshot are revalidated with ETag and
+Last-Modified, so unchanged pages cost a 304. Every page is appended to
+the snapshot as soon as it is fetched. The bot only reads the snapshot,
+never the network, at request time.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import urllib.robotparser
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_path)
+
+from config import WEBSITE_URL, SITE_SNAPSHOT_FILE, CRAWL_MAX_PAGES, CRAWL_CONCURRENCY
+from config import CRAWL_HOST_DELAY, CRAWL_TIMEOUT, CRAWL_USER_AGENT
+from site_snapshot import SiteSnapshot, split_passages
+
+# Text inside these tags is never page content (links in navigation are still followed)
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'nav'}
+
+# Tags that end a block of text
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'aside', 'li', 'ul', 'ol',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'tr', 'td', 'th', 'table', 'blockquote', 'pre', 'form'
+}
+
+
+class PageParser(HTMLParser):
+    """Extract the title, meta description, text blocks and links of an HTML page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.description = ''
+        self.blocks: List[str] = []
+        self.links: List[str] = []
+        self.current: List[str] = []
+        self.skip_depth = 0
+        self.in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'body':
+            # Pages that never close <head> still have their body text read
+            self.skip_depth = 0
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'meta' and (attrs.get('name') or '').lower() == 'description':
+            self.description = (attrs.get('content') or '').strip()
+        elif tag == 'a' and attrs.get('href'):
+            self.links.append(attrs['href'])
+        if tag in BLOCK_TAGS:
+            self.flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == 'title':
+            self.in_title = False
+        if tag in BLOCK_TAGS:
+            self.flush()
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        elif not self.skip_depth:
+            self.current.append(data)
+
+    def flush(self):
+        text = ' '.join(''.join(self.current).split())
+        if text:
+            self.blocks.append(text)
+        self.current = []
+
+    def close(self):
+        super().close()
+        self.flush()
+        self.title = ' '.join(self.title.split())
+
+
+def parse_page(html: str) -> PageParser:
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Absolute http(s) URL without fragment, or None for other schemes"""
+    if base:
+        url = urllib.parse.urljoin(base, url)
+    url, _ = urllib.parse.urldefrag(url.strip())
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+
+class FetchResult:
+    """Outcome of one HTTP request; header names are lowercased"""
+
+    def __init__(self, url: str, status: int, headers: Optional[Dict[str, str]] = None, body: bytes = b''):
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+
+
+def lowercase_headers(message) -> Dict[str, str]:
+    """Header names differ in case between servers (http.server sends 'Content-type')"""
+    return {name.lower(): value for name, value in message.items()} if message else {}
+
+
+def fetch(url: str, headers: Dict[str, str], timeout: float) -> FetchResult:
+    """Blocking HTTP GET; run in the crawler's thread pool"""
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return FetchResult(response.geturl(), response.status, lowercase_headers(response.headers), response.read())
+    except urllib.error.HTTPError as e:
+        return FetchResult(url, e.code, lowercase_headers(e.headers))
+    except (urllib.error.URLError, OSError, ValueError):
+        return FetchResult(url, 0)
+
+
+class SiteCrawler:
+    """Breadth-first crawler restricted to the seed hosts"""
+
+    def __init__(self, seeds: List[str], snapshot: SiteSnapshot, max_pages: int = CRAWL_MAX_PAGES,
+                 concurrency: int = CRAWL_CONCURRENCY, host_delay: float = CRAWL_HOST_DELAY,
+                 timeout: float = CRAWL_TIMEOUT, user_agent: str = CRAWL_USER_AGENT):
+        self.seeds = [url for url in (normalize_url(seed) for seed in seeds) if url]
+        self.hosts = {urllib.parse.urlsplit(url).netloc for url in self.seeds}
+        self.snapshot = snapshot
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.host_delay = host_delay
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.robots: Dict[str, urllib.robotparser.RobotFileParser] = {}
+        self.robots_fetches: Dict[str, asyncio.Task] = {}
+        self.host_locks: Dict[str, asyncio.Lock] = {}
+        self.last_request: Dict[str, float] = {}
+        self.seen: set = set()
+        self.visited: set = set()
+        self.stats = {'fetched': 0, 'not_modified': 0, 'removed': 0, 'blocked': 0, 'errors': 0, 'skipped': 0}
+
+    async def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Fetch a URL once the host's politeness delay has passed"""
+        loop = asyncio.get_running_loop()
+        host = urllib.parse.urlsplit(url).netloc
+        lock = self.host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            # The delay is worked out when sending, so a Crawl-delay read from robots.txt
+            # already spaces the first page request after it
+            robots = self.robots.get(host)
+            delay = max(self.host_delay, (robots.crawl_delay(self.user_agent) or 0) if robots else 0)
+            last = self.last_request.get(host)
+            if last is not None and last + delay > loop.time():
+                await asyncio.sleep(last + delay - loop.time())
+            self.last_request[host] = loop.time()
+        request_headers = {'User-Agent': self.user_agent}
+        request_headers.update(headers or {})
+        return await loop.run_in_executor(self.executor, fetch, url, request_headers, self.timeout)
+
+    async def fetch_robots(self, scheme: str, host: str) -> urllib.robotparser.RobotFileParser:
+        robots = urllib.robotparser.RobotFileParser()
+        result = await self.request(f"{scheme}://{host}/robots.txt")
+        if result.status in (401, 403):
+            robots.disallow_all = True
+        elif result.status == 200:
+            robots.parse(result.body.decode('utf-8', errors='replace').splitlines())
+        else:
+            # No robots.txt (or it failed) - everything is allowed
+            robots.allow_all = True
+        self.robots[host] = robots
+        return robots
+
+    async def allowed(self, url: str) -> bool:
+        """Check robots.txt, fetching it once per host even when workers ask concurrently"""
+        parts = urllib.parse.urlsplit(url)
+        fetch_task = self.robots_fetches.get(parts.netloc)
+        if fetch_task is None:
+            fetch_task = asyncio.ensure_future(self.fetch_robots(parts.scheme, parts.netloc))
+            self.robots_fetches[parts.netloc] = fetch_task
+        robots = await fetch_task
+        return robots.can_fetch(self.user_agent, url)
+
+    def enqueue(self, queue: asyncio.Queue, url: Optional[str]) -> None:
+        if url is None or url in self.seen or urllib.parse.urlsplit(url).netloc not in self.hosts:
+            return
+        if len(self.seen) >= self.max_pages:
+            self.stats['skipped'] += 1
+            return
+        self.seen.add(url)
+        queue.put_nowait(url)
+
+    async def visit(self, url: str, queue: asyncio.Queue) -> None:
+        if not await self.allowed(url):
+            self.stats['blocked'] += 1
+            return
+
+        # Revalidate pages we already have instead of downloading them again
+        previous = self.snapshot.get(url)
+        headers = {}
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        result = await self.request(url, headers)
+
+        if result.status == 304 and previous:
+            self.stats['not_modified'] += 1
+            self.visited.add(url)
+            links = previous.get('links', [])
+        elif result.status in (404, 410):
+            self.stats['removed'] += 1
+            if previous:
+                self.snapshot.append({'url': url, 'gone': True})
+            return
+        elif result.status == 200:
+            content_type = result.headers.get('content-type', '')
+            if 'html' not in content_type:
+                return
+            page = parse_page(result.body.decode('utf-8', errors='replace'))
+            links = sorted({link for link in (normalize_url(href, result.url) for href in page.links) if link})
+            content_hash = hashlib.sha1(result.body).hexdigest()
+            self.stats['fetched'] += 1
+            self.visited.add(url)
+            if not previous or previous.get('content_hash') != content_hash or previous.get('links') != links:
+                self.snapshot.append({
+                    'url': url,
+                    'title': page.title,
+                    'description': page.description,
+                    'passages': split_passages(page.blocks),
+                    'links': links,
+                    'etag': result.headers.get('etag'),
+                    'last_modified': result.headers.get('last-modified'),
+                    'content_hash': content_hash,
+                    'fetched_at': time.time()
+                })
+        else:
+            self.stats['errors'] += 1
+            if previous:
+                # Keep serving the last good copy
+                self.visited.add(url)
+            return
+
+        for link in links:
+            self.enqueue(queue, link)
+
+    async def worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            url = await queue.get()
+            try:
+                await self.visit(url, queue)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Crawl error for {url}: {e}", file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    async def crawl(self) -> Dict[str, Any]:
+        """Crawl from the seeds and compact the snapshot; returns crawl statistics"""
+        start = time.perf_counter()
+        self.snapshot.load()
+        queue: asyncio.Queue = asyncio.Queue()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawler') as self.executor:
+            for seed in self.seeds:
+                self.enqueue(queue, seed)
+            workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.concurrency)]
+            await queue.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        # Pages no longer reachable are dropped, unless the page limit cut the crawl short
+        complete = not self.stats['skipped']
+        self.snapshot.compact(keep=self.visited if complete else None)
+        return dict(self.stats, pages=len(self.snapshot.pages), complete=complete,
+                    seconds=round(time.perf_counter() - start, 2))
+
+
+def crawl_site(seeds: Optional[List[str]] = None, snapshot_path: str = SITE_SNAPSHOT_FILE, **options) -> Dict[str, Any]:
+    """Crawl the website into the snapshot file"""
+    crawler = SiteCrawler(seeds or [WEBSITE_URL], SiteSnapshot(snapshot_path), **options)
+    return asyncio.run(crawler.crawl())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Crawl the website into the local knowledge snapshot")
+    parser.add_argument('--seed', action='append', help=f"start URL (repeatable, default {WEBSITE_URL})")
+    parser.add_argument('--snapshot', default=SITE_SNAPSHOT_FILE, help="snapshot file to update")
+    parser.add_argument('--max-pages', type=int, default=CRAWL_MAX_PAGES, help="maximum pages to visit")
+    parser.add_argument('--concurrency', type=int, default=CRAWL_CONCURRENCY, help="concurrent requests")
+    parser.add_argument('--delay', type=float, default=CRAWL_HOST_DELAY, help="seconds between requests to one host")
+    args = parser.parse_args(argv)
+    stats = crawl_site(args.seed, args.snapshot, max_pages=args.max_pages,
+                       concurrency=args.concurrency, host_delay=args.delay)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_path)
+
+from config import EVENT_LOG_DIR, EVENT_LOG_MAX_BYTES, EVENT_LOG_BACKUPS, EVENT_LOG_QUEUE_SIZE
+from cancellation import RequestCancelled
+
+_STOP = object()
+
+
+class EventLogger:
+    """Background writer of structured events to rotating gzip-compressed JSONL files"""
+
+    def __init__(self, directory: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 10, queue_size: int = 10000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.file = None
+        self.file_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def log(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without blocking; drops it if the writer is behind"""
+        if not self.enabled:
+            return False
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+    def start(self) -> None:
+        """Start the writer thread"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name="event-log-writer", daemon=True)
+            self.thread.start()
+        atexit.register(self.close)
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            # Drain whatever else is queued so one flush covers many events
+            while len(batch) < 500:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            self.write([entry for entry in batch if entry is not _STOP])
+            if stop:
+                self.close_file()
+                return
+
+    def write(self, events) -> None:
+        if not events:
+            return
+        try:
+            if self.file is None or self.file_bytes >= self.max_bytes:
+                self.rotate()
+            data = "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events).encode('utf-8')
+            # Each batch is a complete gzip member, so the file can be read while it is still
+            # being written and survives a process that is killed before closing it
+            self.file.write(gzip.compress(data))
+            self.file.flush()
+            self.file_bytes += len(data)
+            with self.lock:
+                self.written += len(events)
+        except (OSError, TypeError, ValueError):
+            with self.lock:
+                self.errors += 1
+                self.dropped += len(events)
+
+    def rotate(self) -> None:
+        """Start a new log file and remove the oldest ones beyond the backup count"""
+        self.close_file()
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"events-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}.jsonl.gz"
+        self.file = open(os.path.join(self.directory, name), 'ab')
+        self.file_bytes = 0
+        existing = sorted(glob.glob(os.path.join(self.directory, 'events-*.jsonl.gz')), key=os.path.getmtime)
+        for path in existing[:max(0, len(existing) - self.backups - 1)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close_file(self) -> None:
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush queued events and stop the writer thread"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'queued': self.queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'errors': self.errors
+            }
+
+
+event_logger = EventLogger(EVENT_LOG_DIR, EVENT_LOG_MAX_BYTES, EVENT_LOG_BACKUPS, EVENT_LOG_QUEUE_SIZE)
+
+_local = threading.local()
+
+
+def current_event() -> Optional[Dict[str, Any]]:
+    """The event of the request being handled on this thread, if any"""
+    return getattr(_local, 'event', None)
+
+
+@contextmanager
+def request_event(query: str, source: str = "api"):
+    """Collect structured fields for one request and log them when it finishes"""
+    if not event_logger.enabled or current_event() is not None:
+        # Logging is off, or an outer request on this thread already owns the event
+        yield current_event() or {}
+        return
+
+    event = {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'request_id': uuid.uuid4().hex[:12],
+        'source': source,
+        'query': query,
+        'steps': []
+    }
+    _local.event = event
+    start = time.perf_counter()
+    try:
+        yield event
+    except RequestCancelled as e:
+        event['cancelled'] = e.reason
+        raise
+    except Exception as e:
+        event['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        event['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        _local.event = None
+        event_logger.log(event)
+
+
+def record(**fields) -> None:
+    """Set fields on the current request event"""
+    event = current_event()
+    if event is not None:
+        event.update(fields)
+
+
+def add_step(step: str, **fields) -> None:
+    """Append a step (agent call, fallback, error) to the current request event"""
+    event = current_event()
+    if event is not None:
+        fields['step'] = step
+        event['steps'].append(fields)
+
+
+def iter_log_lines(path: str) -> Iterator[str]:
+    """Yield the lines of a plain or gzip-compressed log, stopping cleanly at a truncated end"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                yield line
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            # The last batch of a file whose writer was killed mid-write
+            return
+
+
+def iter_logged_queries(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the queries recorded in event log files, for cache warming and replay"""
+    for path in paths:
+        for line in iter_log_lines(path):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                query = json.loads(line).get('query')
+            except (ValueError, AttributeError):
+                continue
+            if query:
+                yield query
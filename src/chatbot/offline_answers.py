@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from bm25 import BM25Index
+from catalog import catalog_files
+
+# Matches in the question text count more than in the answer text
+FAQ_FIELD_WEIGHTS = {'question': 3.0, 'keywords': 2.0, 'answer': 1.0}
+
+
+def load_faqs(path: str) -> List[Dict[str, Any]]:
+    """Load FAQ entries from a JSON data file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('faqs', [])
+    except FileNotFoundError:
+        print(f"FAQ file not found: {path}")
+    except UnicodeDecodeError as e:
+        print(f"Encoding error reading FAQ file {path}: {e}")
+    except json.JSONDecodeError as e:
+        print(f"JSON parsing error in {path}: {e}")
+    return []
+
+
+class OfflineAnswers:
+    """Answers questions from the FAQ corpus without any network calls"""
+
+    def __init__(self, paths: List[str], min_confidence: float = 0.3):
+        self.paths = list(paths)
+        self.min_confidence = min_confidence
+        self.lock = threading.Lock()
+        self.mtimes: Dict[str, float] = {}
+        self.faqs: List[Dict[str, Any]] = []
+        self.index = BM25Index([])
+        self.reload()
+
+    def reload(self) -> bool:
+        """Rebuild the index if any FAQ file changed; returns True when it was rebuilt"""
+        files = catalog_files(self.paths)
+        mtimes = {}
+        for path in files:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                pass
+        with self.lock:
+            if self.faqs and mtimes == self.mtimes:
+                return False
+            faqs = [faq for path in mtimes for faq in load_faqs(path) if faq.get('answer')]
+            index = BM25Index([
+                {
+                    'question': ' '.join([faq.get('question', '')] + faq.get('questions', [])),
+                    'keywords': ' '.join(faq.get('keywords', [])),
+                    'answer': faq['answer']
+                }
+                for faq in faqs
+            ], FAQ_FIELD_WEIGHTS)
+            self.faqs, self.index, self.mtimes = faqs, index, mtimes
+            return True
+
+    def search(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Ranked FAQ entries for a query, with their BM25 score and confidence"""
+        faqs, index = self.faqs, self.index
+        return [
+            {'question': faqs[hit.doc_id].get('question', ''), 'answer': faqs[hit.doc_id]['answer'],
+             'score': hit.score, 'confidence': hit.confidence}
+            for hit in index.search(query, limit)
+        ]
+
+    def answer(self, query: str) -> Optional[Dict[str, Any]]:
+        """The best FAQ entry if it is confident enough, otherwise None"""
+        hits = self.search(query, limit=1)
+        if hits and hits[0]['confidence'] >= self.min_confidence:
+            return hits[0]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'faqs': len(self.faqs), 'terms': len(self.index.postings), 'min_confidence': self.min_confidence}
@@ -0,0 +1,150 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_path)
+
+from config import PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILE_TOKEN, PROFILE_TOP_N, PROFILE_SAMPLE_INTERVAL_MS
+
+# Request header that turns profiling on for a single request
+PROFILE_HEADER = 'X-Profile-Token'
+
+_local = threading.local()
+# Whether the current request is profiled, decided once per request. It lives in the request
+# context, so work the request hands to another thread (copy_context) is profiled there too.
+_request_decision: ContextVar[Optional[bool]] = ContextVar('profile_decision', default=None)
+_counter_lock = threading.Lock()
+_profile_counter = 0
+
+
+def is_profiling_requested(headers) -> bool:
+    """Check whether a request carries a valid privileged profiling header"""
+    if not PROFILE_TOKEN or headers is None:
+        return False
+    token = headers.get(PROFILE_HEADER)
+    # Compared as bytes: compare_digest raises TypeError on non-ASCII strings
+    return bool(token) and hmac.compare_digest(token.encode('utf-8', 'surrogateescape'), PROFILE_TOKEN.encode('utf-8'))
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread and aggregates it as collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def _next_profile_name(label: str) -> str:
+    """Build a unique file name prefix for a profile"""
+    global _profile_counter
+    with _counter_lock:
+        _profile_counter += 1
+        number = _profile_counter
+    slug = re.sub(r'[^a-zA-Z0-9]+', '-', label).strip('-') or 'request'
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{os.getpid()}-{number}"
+
+
+def write_profile(label: str, profiler: cProfile.Profile, sampler: StackSampler, elapsed: float) -> Dict[str, Any]:
+    """Write the cProfile dump, collapsed stacks and top-N summary for one request"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, _next_profile_name(label))
+
+    profiler.dump_stats(base + '.prof')
+
+    # Collapsed stacks are the input format for flamegraph.pl and speedscope
+    with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    summary = io.StringIO()
+    summary.write(f"{label}: {elapsed * 1000:.1f} ms wall time, {sum(sampler.stacks.values())} stack samples\n\n")
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(summary.getvalue())
+
+    return {'label': label, 'path': base, 'elapsed_ms': round(elapsed * 1000, 1)}
+
+
+def is_sampled() -> bool:
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def profiling_decided(force: bool = False):
+    """Decide once (forced or sampled) whether this request is profiled, for every profile_request in its context"""
+    decision = _request_decision.set(force or is_sampled())
+    try:
+        yield _request_decision.get()
+    finally:
+        _request_decision.reset(decision)
+
+
+@contextmanager
+def profile_request(label: str, force: bool = False):
+    """Profile the enclosed block when the request is profiled (or sampled/forced); a no-op otherwise"""
+    decided = _request_decision.get()
+    if not force and not (decided if decided is not None else is_sampled()):
+        yield None
+        return
+    # Nested calls (handler -> get_chat_response) are covered by the outer profile
+    if getattr(_local, 'active', False):
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already attached to this thread
+        yield None
+        return
+
+    _local.active = True
+    sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+    sampler.start()
+    result: Dict[str, Any] = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        elapsed = time.perf_counter() - start
+        profiler.disable()
+        sampler.stop()
+        _local.active = False
+        try:
+            result.update(write_profile(label, profiler, sampler, elapsed))
+        except OSError as e:
+            result['error'] = str(e)
+
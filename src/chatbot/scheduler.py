@@ -0,0 +1,290 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from cancellation import CancelToken, RequestCancelled
+
+# Deterministic answers (greeting, price, duration, course) run inline and never queue
+FAST_LANE = 'fast'
+# Anything that needs CrewAI/OpenAI waits for a slot in the bounded LLM pool
+LLM_LANE = 'llm'
+
+# Recent samples kept per lane for wait and service time percentiles
+STATS_WINDOW = 1000
+
+# Identifies the caller for fair sharing of the LLM workers; the lightweight function
+# sets it on forwarded requests so the full function sees the end user, not itself
+CLIENT_ID_HEADER = 'X-Client-Id'
+# Proves a forwarded request comes from the lightweight function (see FORWARD_SECRET)
+FORWARD_SECRET_HEADER = 'X-Forward-Secret'
+
+
+class SchedulerBusy(RuntimeError):
+    """The LLM lane's queue (or the client's share of it) is full"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_trusted_forward(headers, secret: str) -> bool:
+    """Whether a request carries the shared forwarding secret"""
+    if not secret or headers is None:
+        return False
+    value = headers.get(FORWARD_SECRET_HEADER)
+    return bool(value) and hmac.compare_digest(value.encode('utf-8', 'surrogateescape'), secret.encode('utf-8'))
+
+
+def get_client_id(headers, client_address, trusted: bool = False) -> str:
+    """Client id set by a trusted hop, else the address the nearest proxy saw, else the peer address"""
+    if trusted:
+        client_id = headers.get(CLIENT_ID_HEADER)
+        if client_id:
+            return client_id.strip()[:128]
+    forwarded = headers.get('X-Forwarded-For') if headers is not None else None
+    if forwarded:
+        # Proxies append the address they saw; earlier entries come from the client and can be made up
+        return forwarded.split(',')[-1].strip()
+    return client_address[0] if client_address else 'anonymous'
+
+
+def percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[max(0, int(len(ordered) * fraction + 0.5) - 1)], 2)
+
+
+class LaneStats:
+    """Counters and recent wait/service times of one lane"""
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        self.waits: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self.service: Deque[float] = deque(maxlen=STATS_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits, service = list(self.waits), list(self.service)
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'cancelled': self.cancelled,
+            'max_depth': self.max_depth,
+            'wait_ms_p50': percentile(waits, 0.5),
+            'wait_ms_p95': percentile(waits, 0.95),
+            'service_ms_p50': percentile(service, 0.5),
+            'service_ms_p95': percentile(service, 0.95)
+        }
+
+
+class FastLane:
+    """Runs cheap requests on the caller's thread, only keeping statistics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = LaneStats()
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        with self.lock:
+            self.in_flight += 1
+            self.stats.max_depth = max(self.stats.max_depth, self.in_flight)
+        start = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.stats.completed += 1
+                self.stats.failed += int(failed)
+                self.stats.waits.append(0.0)
+                self.stats.service.append((time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.stats.snapshot(), depth=0, active=self.in_flight)
+
+
+class Job:
+    """A queued call and the future its caller waits on"""
+    __slots__ = ('client', 'fn', 'args', 'kwargs', 'future', 'enqueued', 'token', 'started', 'released')
+
+    def __init__(self, client: str, fn: Callable, args: tuple, kwargs: dict, token: Optional[CancelToken] = None):
+        self.client = client
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+        self.token = token
+        self.started: Optional[float] = None
+        # Set once the job's slot is handed back, which happens early for cancelled jobs
+        self.released = False
+
+
+class LLMLane:
+    """Bounded pool for slow requests with per-client queues served round-robin.
+
+    At most `workers` jobs hold a slot. A cancelled job gives its slot back at once but
+    keeps its thread until it reaches a cancellation check, so the pool has `workers`
+    spare threads for jobs winding down. A job only starts when a thread is free, so
+    at most 2 * `workers` threads run and waiting jobs stay visible in the queue.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 32, max_queue_per_client: int = 4):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.lock = threading.Lock()
+        # Clients with waiting jobs, in the order they get their next turn
+        self.queues: 'OrderedDict[str, Deque[Job]]' = OrderedDict()
+        self.queued = 0
+        self.active = 0
+        # Cancelled jobs whose slot was handed back but whose thread is still running
+        self.winding_down = 0
+        self.threads = self.workers * 2
+        self.stats = LaneStats()
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, client: str, fn: Callable, *args, cancel_token: Optional[CancelToken] = None, **kwargs) -> Future:
+        """Queue a call for the client; raises SchedulerBusy when the queue limits are reached"""
+        if cancel_token is not None:
+            cancel_token.check()
+        with self.lock:
+            queue = self.queues.get(client)
+            if self.queued >= self.max_queue:
+                self.stats.rejected += 1
+                raise SchedulerBusy("Too many requests are waiting for an answer", retry_after=self.retry_after())
+            if queue is not None and len(queue) >= self.max_queue_per_client:
+                self.stats.rejected += 1
+                raise SchedulerBusy("Too many of your requests are waiting for an answer", retry_after=self.retry_after())
+            job = Job(client, fn, args, kwargs, cancel_token)
+            if queue is None:
+                queue = self.queues[client] = deque()
+            queue.append(job)
+            self.queued += 1
+            self.stats.max_depth = max(self.stats.max_depth, self.queued)
+            self.dispatch()
+        if cancel_token is not None:
+            remove_callback = cancel_token.add_callback(lambda: self.cancel(job))
+            job.future.add_done_callback(lambda _: remove_callback())
+        return job.future
+
+    def cancel(self, job: Job) -> None:
+        """Drop a cancelled job from its queue, or hand back its slot while the worker winds down"""
+        reason = job.token.reason if job.token is not None else 'cancelled'
+        with self.lock:
+            if job.started is None:
+                queue = self.queues.get(job.client)
+                if queue is None or job not in queue:
+                    return
+                queue.remove(job)
+                if not queue:
+                    del self.queues[job.client]
+                self.queued -= 1
+            elif self.release(job):
+                self.winding_down += 1
+            else:
+                return
+            self.stats.cancelled += 1
+            self.dispatch()
+        # The caller stops waiting now; a running job notices at its next cancellation check
+        if not job.future.done():
+            try:
+                job.future.set_exception(RequestCancelled(reason))
+            except InvalidStateError:
+                pass
+
+    def release(self, job: Job) -> bool:
+        """Free the job's slot once; called with the lock held"""
+        if job.released:
+            return False
+        job.released = True
+        self.active -= 1
+        self.stats.service.append((time.perf_counter() - job.started) * 1000)
+        return True
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent service times"""
+        service = percentile(self.stats.service, 0.5) / 1000
+        return max(1, int(service * (self.queued + 1) / self.workers + 0.5))
+
+    def dispatch(self) -> None:
+        """Start queued jobs while a slot and a thread are free; called with the lock held"""
+        while self.active < self.workers and self.active + self.winding_down < self.threads and self.queues:
+            # Round-robin: take the next client's oldest job and send the client to the back
+            client, queue = self.queues.popitem(last=False)
+            job = queue.popleft()
+            if queue:
+                self.queues[client] = queue
+            self.queued -= 1
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self.active += 1
+            job.started = time.perf_counter()
+            self.stats.waits.append((job.started - job.enqueued) * 1000)
+            if self.executor is None:
+                # Spare threads let new jobs start while cancelled ones reach their next cancellation check
+                self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='llm-lane')
+            self.executor.submit(self.run, job)
+
+    def run(self, job: Job) -> None:
+        failed = False
+        try:
+            result = job.fn(*job.args, **job.kwargs)
+            if not job.future.done():
+                job.future.set_result(result)
+        except RequestCancelled as e:
+            if job.token is not None:
+                job.token.cancel(e.reason)
+            if not job.future.done():
+                job.future.set_exception(e)
+        except BaseException as e:
+            failed = True
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            with self.lock:
+                if self.release(job):
+                    self.stats.completed += 1
+                    self.stats.failed += int(failed)
+                else:
+                    # Cancelled earlier; its thread is free only now
+                    self.winding_down -= 1
+                self.dispatch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.stats.snapshot(), depth=self.queued, active=self.active,
+                        winding_down=self.winding_down, workers=self.workers, threads=self.threads,
+                        clients_waiting=len(self.queues))
+
+
+class RequestScheduler:
+    """Sends deterministic requests through the fast lane and LLM requests through the bounded lane"""
+
+    def __init__(self, llm_workers: int = 4, max_queue: int = 32, max_queue_per_client: int = 4):
+        self.fast = FastLane()
+        self.llm = LLMLane(llm_workers, max_queue, max_queue_per_client)
+
+    def run(self, lane: str, client: str, fn: Callable, *args,
+            cancel_token: Optional[CancelToken] = None, **kwargs) -> Any:
+        """Run fn in the given lane and wait for its result; raises RequestCancelled if the token is cancelled first"""
+        if lane == FAST_LANE:
+            return self.fast.run(fn, *args, **kwargs)
+        return self.llm.submit(client, fn, *args, cancel_token=cancel_token, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {FAST_LANE: self.fast.snapshot(), LLM_LANE: self.llm.snapshot()}
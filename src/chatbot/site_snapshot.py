@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from bm25 import BM25Index
+
+# Passages are cut at block boundaries once they reach this many characters
+PASSAGE_CHARS = 500
+
+
+def split_passages(blocks: List[str], max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """Merge consecutive text blocks into passages of up to max_chars"""
+    passages = []
+    current = ''
+    for block in blocks:
+        if current and len(current) + len(block) + 1 > max_chars:
+            passages.append(current)
+            current = ''
+        current = f"{current} {block}".strip()
+        while len(current) > max_chars:
+            cut = current.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            passages.append(current[:cut].strip())
+            current = current[cut:].strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+class SiteSnapshot:
+    """Crawled pages persisted as an append-only JSONL file and searched offline"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.mtime = None
+        self.passages: List[tuple] = []
+        self.index = BM25Index([])
+
+    def load(self) -> bool:
+        """Read the snapshot if it changed on disk; later records for a URL replace earlier ones"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        with self.lock:
+            if mtime == self.mtime:
+                return False
+            pages = {}
+            if mtime is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            page = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A crawl interrupted mid-write leaves a partial last line
+                            continue
+                        if page.get('gone'):
+                            pages.pop(page['url'], None)
+                        else:
+                            pages[page['url']] = page
+            self.pages = pages
+            self.mtime = mtime
+            self.build_index()
+            return True
+
+    def build_index(self) -> None:
+        """Index passages (with their page title) for offline search"""
+        passages = [
+            (url, page.get('title', ''), text)
+            for url, page in self.pages.items()
+            for text in page.get('passages', [])
+        ]
+        self.index = BM25Index([{'title': title, 'text': text} for _, title, text in passages])
+        self.passages = passages
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.pages.get(url)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Persist one page (or a {'url', 'gone'} removal) immediately, so an interrupted crawl keeps its progress"""
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if record.get('gone'):
+                self.pages.pop(record['url'], None)
+            else:
+                self.pages[record['url']] = record
+
+    def compact(self, keep: Optional[set] = None) -> None:
+        """Rewrite the file with one record per page, optionally keeping only the given URLs"""
+        with self.lock:
+            if keep is not None:
+                self.pages = {url: page for url, page in self.pages.items() if url in keep}
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for url in sorted(self.pages):
+                    f.write(json.dumps(self.pages[url], ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.path)
+            self.mtime = os.path.getmtime(self.path)
+            self.build_index()
+
+    def search(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Best BM25 passage per page for a query, for at most limit pages"""
+        self.load()
+        passages, index = self.passages, self.index
+        results = []
+        seen_urls = set()
+        # Over-fetch so several passages from one page do not crowd out other pages
+        for hit in index.search(query, limit * 4):
+            url, title, text = passages[hit.doc_id]
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            results.append({'url': url, 'title': title, 'snippet': text, 'score': hit.score})
+            if len(results) == limit:
+                break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {'pages': len(self.pages), 'passages': len(self.passages)}
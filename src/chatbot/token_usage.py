@@ -0,0 +1,155 @@
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Callable
+
+# Token usage of the LLM calls made for the request being handled
+request_usage: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar('request_usage', default=None)
+
+# Budgets move in steps of this many tokens so agents are not rebuilt for tiny changes
+BUDGET_STEP = 32
+
+
+def summarize_usage(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Total the token usage of a request's LLM calls"""
+    return {
+        'prompt_tokens': sum(call.get('prompt_tokens', 0) for call in calls),
+        'completion_tokens': sum(call.get('completion_tokens', 0) for call in calls),
+        'total_tokens': sum(call.get('prompt_tokens', 0) + call.get('completion_tokens', 0) for call in calls),
+        'calls': calls
+    }
+
+
+class UsageTracker:
+    """Aggregates token usage and latency per agent, route and model"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals: Dict[tuple, Dict[str, Any]] = {}
+
+    def record(self, agent: str, route: str, model: str, prompt_tokens: int, completion_tokens: int,
+               latency_ms: float, truncated: bool = False) -> Dict[str, Any]:
+        """Add one LLM call to the aggregates and to the current request's usage"""
+        call = {
+            'agent': agent,
+            'route': route,
+            'model': model,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'latency_ms': latency_ms,
+            'truncated': truncated
+        }
+        with self.lock:
+            totals = self.totals.setdefault((agent, route, model), {
+                'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'latency_ms_total': 0.0, 'latency_ms_max': 0.0, 'truncated': 0
+            })
+            totals['calls'] += 1
+            totals['prompt_tokens'] += prompt_tokens
+            totals['completion_tokens'] += completion_tokens
+            totals['latency_ms_total'] += latency_ms
+            totals['latency_ms_max'] = max(totals['latency_ms_max'], latency_ms)
+            totals['truncated'] += int(truncated)
+
+        calls = request_usage.get()
+        if calls is not None:
+            calls.append(call)
+        return call
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            items = [(key, dict(totals)) for key, totals in self.totals.items()]
+        snapshot = []
+        for (agent, route, model), totals in sorted(items):
+            calls = totals['calls']
+            snapshot.append({
+                'agent': agent,
+                'route': route,
+                'model': model,
+                'calls': calls,
+                'prompt_tokens': totals['prompt_tokens'],
+                'completion_tokens': totals['completion_tokens'],
+                'avg_completion_tokens': round(totals['completion_tokens'] / calls, 1),
+                'avg_latency_ms': round(totals['latency_ms_total'] / calls, 1),
+                'max_latency_ms': round(totals['latency_ms_max'], 1),
+                'truncated': totals['truncated']
+            })
+        return snapshot
+
+
+class BudgetManager:
+    """Per-agent output budgets that shrink when answers stay short or slow, and recover when truncated"""
+
+    def __init__(self, budget_for: Callable[[str], Dict[str, Any]], window: int = 20, adaptive: bool = True):
+        self.budget_for = budget_for
+        self.window = window
+        self.adaptive = adaptive
+        self.lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {}
+
+    def _state(self, name: str) -> Dict[str, Any]:
+        budget = self.budget_for(name)
+        state = self.state.get(name)
+        if state is None or state['budget'] != budget:
+            # New agent or its configured budget changed - start again from the configured limit
+            state = {'budget': budget, 'limit': budget['max_tokens'], 'samples': deque(maxlen=self.window), 'adjustments': 0}
+            self.state[name] = state
+        return state
+
+    def limits(self, name: str) -> Dict[str, Any]:
+        """Current max_tokens and stop sequences for an agent or route"""
+        with self.lock:
+            state = self._state(name)
+            limits = {'max_tokens': state['limit']}
+            if state['budget'].get('stop'):
+                limits['stop'] = list(state['budget']['stop'])
+            return limits
+
+    def observe(self, name: str, completion_tokens: int, latency_ms: float, truncated: bool) -> None:
+        """Feed one answer into the budget and adapt the limit once a full window is seen"""
+        if not self.adaptive:
+            return
+        with self.lock:
+            state = self._state(name)
+            samples = state['samples']
+            samples.append((completion_tokens, latency_ms, truncated))
+            if len(samples) < self.window:
+                return
+
+            budget = state['budget']
+            ceiling = budget['max_tokens']
+            floor = budget.get('min_tokens', min(ceiling, 128))
+            tokens = sorted(sample[0] for sample in samples)
+            latencies = sorted(sample[1] for sample in samples)
+            p95_tokens = tokens[int(len(tokens) * 0.95) - 1]
+            p95_latency = latencies[int(len(latencies) * 0.95) - 1]
+            truncated_share = sum(1 for sample in samples if sample[2]) / len(samples)
+            slo = budget.get('latency_slo_ms')
+
+            limit = state['limit']
+            if truncated_share > 0.2:
+                # Answers are being cut off - give the budget back
+                limit = limit * 1.25
+            elif slo and p95_latency > slo:
+                limit = limit * 0.8
+            elif p95_tokens < limit * 0.5:
+                # Answers consistently end far below the limit
+                limit = p95_tokens * 1.5
+            limit = max(floor, int(min(ceiling, limit)) // BUDGET_STEP * BUDGET_STEP)
+
+            if limit != state['limit']:
+                state['limit'] = limit
+                state['adjustments'] += 1
+            samples.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                name: {
+                    'max_tokens': state['limit'],
+                    'configured_max_tokens': state['budget']['max_tokens'],
+                    'adjustments': state['adjustments'],
+                    'adaptive': self.adaptive
+                }
+                for name, state in self.state.items()
+            }
@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+from agent_registry import AgentRegistry
+
+AGENTS_FILE = os.path.join(os.path.dirname(__file__), '..', 'src', 'chatbot', 'agents.json')
+
+
+class StubExecutor:
+    def __init__(self):
+        self.messages = []
+
+
+class StubAgent:
+    """Keeps its executor and message history on the instance, as crewai.Agent does"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+        self.agent_executor = None
+
+    def execute_task(self, prompt, barrier):
+        self.agent_executor = StubExecutor()
+        self.agent_executor.messages.append(prompt)
+        barrier.wait(2)
+        return list(self.agent_executor.messages)
+
+
+class StubChatModel:
+    def __init__(self, **config):
+        self.config = config
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'crewai', types.SimpleNamespace(Agent=StubAgent, LLM=StubChatModel))
+    monkeypatch.setitem(sys.modules, 'langchain_openai', types.SimpleNamespace(ChatOpenAI=StubChatModel))
+    return AgentRegistry(AGENTS_FILE, {'model': 'gpt-test', 'api_key': 'test'})
+
+
+def test_concurrent_runs_do_not_share_an_agent(registry):
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(prompt):
+        results[prompt] = registry.get_agent('advisor').execute_task(prompt, barrier)
+
+    threads = [threading.Thread(target=run, args=(prompt,)) for prompt in ('first user', 'second user')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {'first user': ['first user'], 'second user': ['second user']}
+
+
+def test_agents_share_their_chat_model(registry):
+    first, second = registry.get_agent('advisor'), registry.get_agent('advisor')
+
+    assert first is not second
+    assert first.llm is second.llm
+    assert registry.get_agent('advisor', stream=True).llm is not first.llm
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from cancellation import CancelToken, RequestCancelled, DISCONNECTED, SUPERSEDED
+from scheduler import LLMLane
+
+import pytest
+
+
+def test_child_follows_parent():
+    parent = CancelToken()
+    child = parent.child()
+    parent.cancel(DISCONNECTED)
+    assert child.reason == DISCONNECTED
+    with pytest.raises(RequestCancelled):
+        child.check()
+
+
+def test_child_cancels_alone():
+    parent = CancelToken()
+    loser, winner = parent.child(), parent.child()
+    loser.cancel(SUPERSEDED)
+    assert loser.cancelled
+    assert not winner.cancelled and not parent.cancelled
+    # The cancelled child no longer listens to the parent
+    assert len(parent.callbacks) == 1
+
+
+def test_cancelled_jobs_keep_their_thread_until_they_finish():
+    lane = LLMLane(workers=1)
+    stalled = [threading.Event() for _ in range(3)]
+    started = []
+
+    def job(index):
+        started.append(index)
+        stalled[index].wait(5)
+        return index
+
+    tokens = [CancelToken() for _ in range(3)]
+    futures = [lane.submit('client', job, index, cancel_token=token) for index, token in enumerate(tokens)]
+    wait_for(lambda: started == [0])
+
+    # The cancelled job's slot goes to the next job, on the spare thread
+    tokens[0].cancel(DISCONNECTED)
+    wait_for(lambda: started == [0, 1])
+    with pytest.raises(RequestCancelled):
+        futures[0].result(1)
+
+    # Both threads are busy, so the last job stays queued even after the slot frees up again
+    tokens[1].cancel(DISCONNECTED)
+    time.sleep(0.1)
+    assert started == [0, 1]
+    snapshot = lane.snapshot()
+    assert (snapshot['active'], snapshot['winding_down'], snapshot['depth']) == (0, 2, 1)
+
+    stalled[0].set()
+    wait_for(lambda: started == [0, 1, 2])
+    stalled[1].set()
+    stalled[2].set()
+    assert futures[2].result(1) == 2
+    wait_for(lambda: lane.snapshot()['winding_down'] == 0)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+
+from catalog import CourseCatalog
+
+
+def write_shard(path, courses, mtime):
+    path.write_text(json.dumps({'courses': courses}), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def course(name, category):
+    return {'name': name, 'category': category, 'short_description': f'{name} from scratch'}
+
+
+def test_keeps_a_file_that_fails_to_parse(tmp_path):
+    write_shard(tmp_path / 'a.json', {'python': course('Python', 'Programming')}, 1000)
+    write_shard(tmp_path / 'b.json', {'go': course('Go', 'Programming')}, 1000)
+    catalog = CourseCatalog([str(tmp_path)])
+    assert 'go' in catalog
+
+    # An editor caught halfway through saving b.json
+    (tmp_path / 'b.json').write_text('{"courses": {"go": {"name": "G', encoding='utf-8')
+    os.utime(tmp_path / 'b.json', (2000, 2000))
+    catalog.reload()
+
+    assert 'go' in catalog
+    assert catalog.list_courses(keyword='go')['total'] == 1
+
+    # Retried once the file is whole again
+    write_shard(tmp_path / 'b.json', {'go': course('Go', 'Programming'), 'rust': course('Rust', 'Systems')}, 3000)
+    assert catalog.reload()
+    assert 'rust' in catalog and 'go' in catalog
+
+
+def test_readers_never_see_a_half_reloaded_catalog(tmp_path):
+    first = {f'course{i}': course(f'Course {i}', 'First') for i in range(200)}
+    second = {f'other{i}': course(f'Other {i}', 'Second') for i in range(200)}
+    write_shard(tmp_path / 'a.json', first, 1000)
+    catalog = CourseCatalog([str(tmp_path)])
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                catalog.list_courses(keyword='course', page_size=100)
+                catalog.list_courses(category='First', page_size=100)
+                catalog.categories()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for mtime in range(2000, 2040):
+        write_shard(tmp_path / 'a.json', second if mtime % 2 else first, mtime)
+        catalog.reload()
+    done.set()
+    reader.join(5)
+
+    assert errors == []
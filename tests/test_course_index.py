@@ -0,0 +1,19 @@
+from course_index import CourseIndex
+
+
+def test_short_term_not_crowded_out_by_long_name():
+    index = CourseIndex({
+        'k8s admin': {'name': 'Kubernetes Administration and Security for Production Clusters'},
+        'kubernetes': {'name': 'Kubernetes'}
+    })
+    match = index.resolve('kubernets course')
+    assert match is not None
+    assert match.course_key == 'kubernetes'
+    assert match.score == 0.9
+
+
+def test_exact_and_unknown_terms():
+    index = CourseIndex({'python': {'name': 'Python Programming'}})
+    assert index.resolve('python fees').score == 1.0
+    assert index.resolve('pyhton fees').course_key == 'python'
+    assert index.resolve('gardening tips') is None
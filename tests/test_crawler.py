@@ -0,0 +1,237 @@
+import functools
+import json
+import os
+import shutil
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler import crawl_site
+from site_snapshot import SiteSnapshot
+
+FIXTURE_SITE = os.path.join(os.path.dirname(__file__), 'fixtures', 'site')
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static fixture site with ETags, 410 for removed paths and a request log.
+
+    SimpleHTTPRequestHandler already answers If-Modified-Since with 304 and
+    sends its headers as 'Content-type', which the crawler must accept.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def etag(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers), time.monotonic()))
+        if self.path in self.server.gone:
+            self.send_error(410)
+            return
+        etag = self.etag()
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def end_headers(self):
+        etag = self.etag()
+        if etag:
+            self.send_header('ETag', etag)
+        super().end_headers()
+
+
+@pytest.fixture
+def site(tmp_path):
+    """The fixture site copied to a temporary directory and served on a free local port"""
+    root = tmp_path / 'site'
+    shutil.copytree(FIXTURE_SITE, root)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(FixtureHandler, directory=str(root)))
+    server.requests = []
+    server.gone = set()
+    server.root = root
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(site, snapshot_path, **options):
+    options.setdefault('host_delay', 0)
+    options.setdefault('concurrency', 4)
+    return crawl_site([site.url], str(snapshot_path), **options)
+
+
+def read_records(snapshot_path):
+    with open(snapshot_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_crawls_fixture_site_into_snapshot(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    stats = crawl(site, snapshot_path)
+
+    assert stats['fetched'] == 3
+    assert stats['blocked'] == 1
+    assert stats['removed'] == 1
+    assert stats['errors'] == 0
+    assert stats['complete'] is True
+
+    records = read_records(snapshot_path)
+    urls = [record['url'] for record in records]
+    assert urls == sorted([site.url, site.url + 'about.html', site.url + 'courses/python.html'])
+    home = next(record for record in records if record['url'] == site.url)
+    assert home['title'] == 'SkillCapital'
+    assert home['description'] == 'Project-based tech courses'
+    assert any('lifetime access' in passage for passage in home['passages'])
+    assert home['etag'] and home['last_modified'] and home['content_hash']
+    # Off-site links are kept in the record but never fetched
+    assert 'https://example.com/elsewhere' in home['links']
+    python = next(record for record in records if record['url'].endswith('python.html'))
+    assert not any('tracking' in passage for passage in python['passages'])
+
+    snapshot = SiteSnapshot(str(snapshot_path))
+    snapshot.load()
+    assert snapshot.search('python automation', limit=1)[0]['url'] == site.url + 'courses/python.html'
+
+
+def test_respects_robots_disallow(site, tmp_path):
+    crawl(site, tmp_path / 'snapshot.jsonl')
+
+    paths = [path for path, _, _ in site.requests]
+    assert paths.count('/robots.txt') == 1
+    assert '/private/admin.html' not in paths
+    user_agents = {headers.get('User-Agent') for _, headers, _ in site.requests}
+    assert len(user_agents) == 1 and None not in user_agents
+
+
+def test_spaces_requests_to_a_host(site, tmp_path):
+    crawl(site, tmp_path / 'snapshot.jsonl', host_delay=0.2)
+
+    times = [when for _, _, when in site.requests]
+    assert len(times) == 5  # robots.txt, three pages and the missing page
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) >= 0.18
+
+
+def test_robots_crawl_delay_overrides_shorter_host_delay(site, tmp_path):
+    (site.root / 'robots.txt').write_text("User-agent: *\nCrawl-delay: 1\n")
+    (site.root / 'index.html').write_text('<html><head><title>Only page</title></head><body><p>Hello</p></body></html>')
+
+    stats = crawl(site, tmp_path / 'snapshot.jsonl', host_delay=0)
+
+    assert stats['fetched'] == 1
+    times = [when for _, _, when in site.requests]
+    assert [path for path, _, _ in site.requests] == ['/robots.txt', '/']
+    assert times[1] - times[0] >= 0.95
+
+
+def test_revalidates_unchanged_pages(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    crawl(site, snapshot_path)
+    first = snapshot_path.read_text(encoding='utf-8')
+    site.requests.clear()
+
+    stats = crawl(site, snapshot_path)
+
+    assert stats['not_modified'] == 3
+    assert stats['fetched'] == 0
+    page_requests = [headers for path, headers, _ in site.requests if path.endswith(('/', '.html'))
+                     and path != '/missing.html']
+    assert len(page_requests) == 3
+    assert all(headers.get('If-None-Match') and headers.get('If-Modified-Since') for headers in page_requests)
+    assert snapshot_path.read_text(encoding='utf-8') == first
+
+
+def test_revalidates_with_last_modified_alone(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    crawl(site, snapshot_path)
+    # Drop the ETags, as for a server that only sends Last-Modified
+    records = read_records(snapshot_path)
+    with open(snapshot_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(dict(record, etag=None)) + '\n')
+    site.requests.clear()
+
+    stats = crawl(site, snapshot_path)
+
+    assert stats['not_modified'] == 3
+    assert not any(headers.get('If-None-Match') for _, headers, _ in site.requests)
+
+
+def test_changed_page_is_fetched_again(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    crawl(site, snapshot_path)
+    about = site.root / 'about.html'
+    about.write_text(about.read_text().replace('India', 'Bengaluru, India'))
+    os.utime(about, (time.time() + 5, time.time() + 5))
+
+    stats = crawl(site, snapshot_path)
+
+    assert stats['fetched'] == 1
+    assert stats['not_modified'] == 2
+    snapshot = SiteSnapshot(str(snapshot_path))
+    snapshot.load()
+    assert any('Bengaluru' in passage for passage in snapshot.get(site.url + 'about.html')['passages'])
+
+
+@pytest.mark.parametrize('status', [404, 410])
+def test_removes_pages_that_disappear(site, tmp_path, status):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    crawl(site, snapshot_path)
+    if status == 404:
+        (site.root / 'about.html').unlink()
+    else:
+        site.gone.add('/about.html')
+
+    stats = crawl(site, snapshot_path)
+
+    assert stats['removed'] == 2  # about.html and the page that never existed
+    urls = [record['url'] for record in read_records(snapshot_path)]
+    assert site.url + 'about.html' not in urls
+    assert len(urls) == 2
+
+
+def test_max_pages_cuts_the_crawl_short(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    crawl(site, snapshot_path)
+
+    stats = crawl(site, snapshot_path, max_pages=2, concurrency=1)
+
+    assert stats['skipped'] > 0
+    assert stats['complete'] is False
+    assert stats['not_modified'] + stats['fetched'] + stats['blocked'] + stats['removed'] <= 2
+    # An incomplete crawl does not drop pages it did not get to
+    assert len(read_records(snapshot_path)) == 3
+
+
+def test_compaction_keeps_one_record_per_page(site, tmp_path):
+    snapshot_path = tmp_path / 'snapshot.jsonl'
+    snapshot = SiteSnapshot(str(snapshot_path))
+    snapshot.append({'url': site.url + 'stale.html', 'title': 'Stale', 'passages': ['old']})
+    snapshot.append({'url': site.url, 'title': 'Old home', 'passages': ['old']})
+    snapshot.append({'url': site.url + 'stale.html', 'gone': True})
+    assert len(read_records(snapshot_path)) == 3
+
+    crawl(site, snapshot_path)
+
+    records = read_records(snapshot_path)
+    urls = [record['url'] for record in records]
+    assert urls == sorted(set(urls))
+    assert len(urls) == 3
+    assert not any(record.get('gone') for record in records)
+    assert next(record for record in records if record['url'] == site.url)['title'] == 'SkillCapital'
@@ -0,0 +1,42 @@
+import os
+import time
+
+from event_log import EventLogger, iter_logged_queries
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def log_files(directory):
+    return sorted(str(path) for path in directory.glob('events-*.jsonl.gz'))
+
+
+def test_reads_a_log_that_is_still_open(tmp_path):
+    logger = EventLogger(str(tmp_path))
+    logger.log({'query': 'python course price'})
+    wait_for(lambda: logger.stats()['written'] == 1)
+    logger.log({'query': 'devops duration'})
+    wait_for(lambda: logger.stats()['written'] == 2)
+
+    assert list(iter_logged_queries(log_files(tmp_path))) == ['python course price', 'devops duration']
+    logger.close()
+
+
+def test_stops_cleanly_at_a_truncated_batch(tmp_path):
+    logger = EventLogger(str(tmp_path))
+    logger.log({'query': 'first'})
+    wait_for(lambda: logger.stats()['written'] == 1)
+    path, = log_files(tmp_path)
+    first_batch = os.path.getsize(path)
+    logger.log({'query': 'second'})
+    wait_for(lambda: logger.stats()['written'] == 2)
+    logger.close()
+    # A writer killed halfway through its last batch
+    with open(path, 'r+b') as f:
+        f.truncate(first_batch + 12)
+
+    assert list(iter_logged_queries([path])) == ['first']
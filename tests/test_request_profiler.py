@@ -0,0 +1,14 @@
+import request_profiler
+from request_profiler import PROFILE_HEADER, is_profiling_requested
+
+
+def test_profile_token_must_match(monkeypatch):
+    monkeypatch.setattr(request_profiler, 'PROFILE_TOKEN', 'secret')
+    assert is_profiling_requested({PROFILE_HEADER: 'secret'})
+    assert not is_profiling_requested({PROFILE_HEADER: 'wrong'})
+    assert not is_profiling_requested({})
+
+
+def test_junk_profile_token_is_not_an_error(monkeypatch):
+    monkeypatch.setattr(request_profiler, 'PROFILE_TOKEN', 'secret')
+    assert not is_profiling_requested({PROFILE_HEADER: 'sécrét'})
@@ -0,0 +1,24 @@
+from scheduler import CLIENT_ID_HEADER, FORWARD_SECRET_HEADER, get_client_id, is_trusted_forward
+
+PEER = ('10.0.0.7', 51234)
+
+
+def test_browser_cannot_choose_its_client_id():
+    headers = {CLIENT_ID_HEADER: 'made-up-id'}
+    assert get_client_id(headers, PEER, trusted=is_trusted_forward(headers, 'secret')) == '10.0.0.7'
+
+
+def test_trusted_hop_names_the_end_user():
+    headers = {CLIENT_ID_HEADER: '203.0.113.9', FORWARD_SECRET_HEADER: 'secret'}
+    assert get_client_id(headers, PEER, trusted=is_trusted_forward(headers, 'secret')) == '203.0.113.9'
+    # No secret configured trusts no hop
+    assert not is_trusted_forward(headers, '')
+
+
+def test_junk_secret_is_not_trusted():
+    assert not is_trusted_forward({FORWARD_SECRET_HEADER: 'sécret'}, 'secret')
+    assert not is_trusted_forward({FORWARD_SECRET_HEADER: 'wrong'}, 'secret')
+
+
+def test_uses_the_address_the_nearest_proxy_saw():
+    assert get_client_id({'X-Forwarded-For': 'spoofed, 198.51.100.4'}, PEER) == '198.51.100.4'